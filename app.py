@@ -1,26 +1,142 @@
+import json
+import logging
+import time
+
 import dash_mantine_components as dmc
-import pandas as pd
+import flask
 from dash import _dash_renderer
-from dash_extensions.enrich import (DashProxy, Input, Output, Serverside,
-                                    ServersideOutputTransform, dcc, html,
+from dash_extensions.enrich import (DashProxy, Input, Output, dcc,
                                     page_container)
 
 from modules.country_map import *
+from modules.analytics_figures import register_figures
+from modules.dataset import get_dataset, refresh_dataset
+from modules.figure_cache import figure_cache
 from modules.helpers import *
+from modules.llm import PROMPTS, stream_for
+from modules.llm_executor import LLMBusy
+from modules.metrics import (CALLBACK_BYTES, CALLBACK_ERRORS, CALLBACK_SECONDS,
+                             CONTENT_TYPE_LATEST, HTTP_BYTES, HTTP_SECONDS,
+                             render)
 
 _dash_renderer._set_react_version("18.2.0")
 
+logger = logging.getLogger(__name__)
+
 app = DashProxy(
     __name__,
     update_title="Autumn App Challenge",
     use_pages=True,
     external_stylesheets=dmc.styles.ALL,
-    transforms=[ServersideOutputTransform()]
     )
 
 app.config.suppress_callback_exceptions = True
 server = app.server
 
+register_figures(figure_cache)
+
+# Routes timed besides the Dash callbacks; streams are timed by timed_stream.
+TIMED_ROUTES = {"/figures/<name>.json"}
+_callback_labels = {}
+
+
+def callback_labels(output) -> dict:
+    """The first output and first input of the callback answering `output`, as metric labels."""
+    labels = _callback_labels.get(output)
+    if labels is None:
+        callback = app.callback_map.get(output)
+        if callback is None:
+            return {"callback": "unknown", "input": "unknown"}
+        first = callback["inputs"][0] if callback["inputs"] else {}
+        id = first.get("id", "")
+        if isinstance(id, dict):
+            id = json.dumps(id, sort_keys=True, separators=(",", ":"))
+        labels = _callback_labels[output] = {
+            "callback": output.strip(".").split("...")[0].split("@")[0],
+            "input": f"{id}.{first.get('property', '')}",
+        }
+    return labels
+
+
+@server.before_request
+def start_timer():
+    flask.g.start = time.perf_counter()
+
+
+@server.after_request
+def record_metrics(response):
+    start = flask.g.pop("start", None)
+    if start is None:
+        return response
+    seconds = time.perf_counter() - start
+    if flask.request.path.endswith("/_dash-update-component"):
+        body = flask.request.get_json(silent=True) or {}
+        labels = callback_labels(body.get("output", ""))
+        CALLBACK_SECONDS.labels(**labels).observe(seconds)
+        CALLBACK_BYTES.labels(**labels).observe(response.content_length or 0)
+        if response.status_code >= 500:
+            CALLBACK_ERRORS.labels(**labels).inc()
+    elif flask.request.url_rule is not None and flask.request.url_rule.rule in TIMED_ROUTES:
+        route = flask.request.url_rule.rule
+        HTTP_SECONDS.labels(route=route).observe(seconds)
+        if response.content_length is not None:
+            HTTP_BYTES.labels(route=route).observe(response.content_length)
+    return response
+
+
+@server.route("/metrics")
+def metrics():
+    """Latencies, payload sizes and cache stats of all workers in the Prometheus text format."""
+    return flask.Response(render(), content_type=CONTENT_TYPE_LATEST)
+
+
+@server.route("/figures/<name>.json")
+def serve_figure(name):
+    dataset = get_dataset()
+    if name not in figure_cache.builders:
+        flask.abort(404)
+    response = flask.Response(figure_cache.get(name, dataset), mimetype="application/json")
+    response.set_etag(f"{name}-{dataset.version}")
+    response.cache_control.no_cache = True
+    return response.make_conditional(flask.request)
+
+
+def timed_stream(chunks, route, start):
+    """Yields `chunks`, recording the time from `start` to the first one as the route's duration."""
+    first = True
+    for chunk in chunks:
+        if first:
+            HTTP_SECONDS.labels(route=route).observe(time.perf_counter() - start)
+            first = False
+        yield chunk
+
+
+@server.route("/llm/<kind>/<int:rid>")
+def stream_llm(kind, rid):
+    """Server-sent events with the completion for a restaurant, piece by piece as Groq writes it."""
+    records = get_dataset().records
+    if kind not in PROMPTS or rid >= len(records):
+        flask.abort(404)
+    record = records.get(rid)
+
+    def events():
+        try:
+            for text in stream_for(kind, record["Name"], record["city"]):
+                yield f"data: {json.dumps({'text': text})}\n\n"
+        except LLMBusy:
+            yield f"event: failed\ndata: {json.dumps({'text': 'Lots of people are planning right now. Please try again in a moment.'})}\n\n"
+        except Exception:
+            logger.exception("Streaming %s for restaurant %s failed", kind, rid)
+            yield f"event: failed\ndata: {json.dumps({'text': 'Sorry, no answer right now. Please try again.'})}\n\n"
+        else:
+            yield "event: done\ndata: {}\n\n"
+
+    # after_request runs before the first event, so the stream times itself.
+    chunks = timed_stream(events(), flask.request.url_rule.rule, flask.g.get("start", time.perf_counter()))
+    return flask.Response(chunks, mimetype="text/event-stream",
+                          headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 def get_nav_content():
     return [
         dmc.Image(
@@ -44,45 +160,12 @@ def get_nav_content():
         ),
     ]
 
-def size_mapping(award):
-    if award == '3 Stars':
-        return 25
-    elif award == '2 Stars':
-        return 20
-    elif award == '1 Star':
-        return 15
-    elif award == 'Bib Gourmand':
-        return 7
-    else:
-        return 5
-
-
-def get_stars(award):
-    if award == '3 Stars':
-        return 3
-    elif award == '2 Stars':
-        return 2
-    elif award == '1 Star':
-        return 1
-    else:
-        return 0
-
-
 @app.callback(
     Output("data-store", "data"),
     Input("url", "search"),
     )
 def display_page(url):
-    df = pd.read_csv(DATA_PATH)
-    df['award_size'] = df['Award'].apply(size_mapping)
-    df["country"] = df.Location.apply(lambda x: x.split(",")[-1].strip())
-    df["country"] = df.country.map(country_name_map)
-    df["city"] = df.Location.apply(lambda x: x.split(",")[0].strip())
-    df["stars"] = df.Award.apply(lambda x: get_stars(x))
-    df["country_codes"] = df.country.map(country_code_map)
-    df["population"] = df.country_codes.map(country_population_map)
-    df.Price = df.Price.astype(str).apply(lambda x: len(x) if x != "nan" else 0)
-    return Serverside(df)
+    return refresh_dataset().version
 
 
 app.layout = dmc.MantineProvider(
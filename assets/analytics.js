@@ -0,0 +1,33 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    countries: {
+        // Fetches the country figure for this dataset version, sorted by sortBy.
+        load: function(version, sortBy) {
+            if (!version) {
+                return window.dash_clientside.no_update;
+            }
+            return fetch(`/figures/countries.json?v=${version}`)
+                .then(response => response.json())
+                .then(figure => window.dash_clientside.countries.sort(sortBy, figure));
+        },
+        // Orders the x categories of every subplot by the sortBy column of the
+        // country table in layout.meta, largest first and missing values last.
+        sort: function(sortBy, figure) {
+            if (!figure || !figure.layout.meta) {
+                return window.dash_clientside.no_update;
+            }
+            const table = figure.layout.meta.countries;
+            const values = table[sortBy];
+            const order = table.country
+                .map((country, i) => [country, values[i]])
+                .sort((a, b) => (b[1] ?? -Infinity) - (a[1] ?? -Infinity))
+                .map(([country]) => country);
+            const layout = Object.assign({}, figure.layout);
+            Object.keys(layout)
+                .filter(key => key.startsWith("xaxis"))
+                .forEach(key => {
+                    layout[key] = Object.assign({}, layout[key], {categoryarray: order});
+                });
+            return Object.assign({}, figure, {layout: layout});
+        },
+    },
+});
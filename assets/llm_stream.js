@@ -0,0 +1,54 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    llm: {
+        // Opens an EventSource on request.url and renders the text it receives
+        // into the children of request.target as it arrives.
+        stream: function(request) {
+            const streams = window.dash_clientside.llm.streams;
+            if (!request) {
+                return window.dash_clientside.no_update;
+            }
+            if (streams[request.target]) {
+                streams[request.target].close();
+            }
+            const source = new EventSource(request.url);
+            streams[request.target] = source;
+            let text = "";
+            const finish = function() {
+                source.close();
+                if (streams[request.target] === source) {
+                    delete streams[request.target];
+                }
+            };
+            source.onmessage = function(event) {
+                text += JSON.parse(event.data).text;
+                window.dash_clientside.set_props(request.target, {children: text});
+            };
+            source.addEventListener("done", finish);
+            source.addEventListener("failed", function(event) {
+                finish();
+                window.dash_clientside.set_props(request.target, {children: JSON.parse(event.data).text});
+            });
+            source.addEventListener("error", function() {
+                finish();
+                if (!text) {
+                    window.dash_clientside.set_props(request.target, {children: "Sorry, no answer right now. Please try again."});
+                }
+            });
+            return "";
+        },
+        // Closing the drawer or modal drops its stream, which cancels the
+        // completion on the server.
+        close: function(opened, request) {
+            const streams = window.dash_clientside.llm.streams;
+            if (opened || !request) {
+                return window.dash_clientside.no_update;
+            }
+            if (streams[request.target]) {
+                streams[request.target].close();
+                delete streams[request.target];
+            }
+            return null;
+        },
+        streams: {},
+    },
+});
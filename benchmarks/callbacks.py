@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate
+from modules.helpers import *
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+# Filters for the filtered cases, common enough to match at every size.
+FILTERS = {"award": ["1 Star", "2 Stars"], "price": ["3", "4"], "cuisine": ["modern"]}
+PARIS = {"lat": 48.857, "lon": 2.352}
+
+
+def find_callback(output, trigger):
+    """The function of the page callback with first output `output` and first input `trigger`."""
+    from dash_extensions.enrich import GLOBAL_BLUEPRINT
+    for callback in GLOBAL_BLUEPRINT.callbacks:
+        if (callback.outputs and str(callback.outputs[0]).startswith(output)
+                and str(callback.inputs[0]) == trigger):
+            return callback.f
+    raise KeyError(f"{trigger} -> {output}")
+
+
+def cases(app, dataset) -> dict:
+    """Name and zero-argument function of every timed case."""
+    from modules.figure_cache import figure_cache
+
+    stats = find_callback("stats-countries.children", "data-store.data")
+    map_view = find_callback("map-fig.figure", "map-fig.relayoutData")
+    filter_map = find_callback("map-fig.figure", "map-filter.data")
+    modal = find_callback("restaurant-description.children", "data-store.data")
+    plan = find_callback("plan-my-day-drawer.opened", "plan-my-day-btn.n_clicks")
+    alternatives = find_callback("alternatives-drawer.opened", "alternatives-btn.n_clicks")
+
+    version = dataset.version
+    rid = int(np.flatnonzero(dataset.df["Award"] == "1 Star")[0])
+    click = {"points": [{"customdata": [rid, "1 Star"]}]}
+    clusters = {"level": 4, "cells": []}
+    zoom_out = {"map.zoom": 6, "map.center": PARIS}
+    zoom_in = {"map.zoom": 11, "map.center": PARIS}
+    return {
+        "display_page": lambda: app.display_page(""),
+        "stats_cards": lambda: stats(version, None),
+        "stats_cards_filtered": lambda: stats(version, FILTERS),
+        "map_figure_build": lambda: figure_cache.render("map", dataset),
+        "map_figure_cached": lambda: figure_cache.get("map", dataset),
+        "map_zoom_clusters": lambda: map_view(zoom_out, clusters, None),
+        "map_zoom_markers": lambda: map_view(zoom_in, clusters, None),
+        "map_zoom_markers_filtered": lambda: map_view(zoom_in, clusters, FILTERS),
+        "map_filter": lambda: filter_map(FILTERS, clusters),
+        "modal": lambda: modal(version, click),
+        "plan_my_day": lambda: plan(1, rid),
+        "alternatives": lambda: alternatives(1, rid, version, None),
+        "alternatives_filtered": lambda: alternatives(1, rid, version, FILTERS),
+        "countries_figure_build": lambda: figure_cache.render("countries", dataset),
+        "countries_figure_cached": lambda: figure_cache.get("countries", dataset),
+        "cuisines_figure_build": lambda: figure_cache.render("cuisines", dataset),
+        "cuisines_figure_cached": lambda: figure_cache.get("cuisines", dataset),
+    }
+
+
+def timings(fn, repeat) -> dict:
+    times = timeit.repeat(fn, number=1, repeat=repeat)
+    return {"min_ms": min(times) * 1e3, "median_ms": statistics.median(times) * 1e3}
+
+
+def run_size(app, rows, repeat, seed) -> dict:
+    from modules.build_data import build
+    from modules.dataset import get_dataset, reset_dataset
+
+    generate(rows, seed).to_csv(DATA_PATH, index=False)
+    results = {"build_data": timings(lambda: build(), 1)}
+    reset_dataset()
+    results["load_dataset"] = timings(lambda: (reset_dataset(), get_dataset()), min(repeat, 3))
+    dataset = get_dataset()
+    for name, fn in cases(app, dataset).items():
+        fn()
+        results[name] = timings(fn, repeat)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(sizes, repeat, seed, out, workdir=None):
+    # Groq is never called; the app and its caches live in a scratch directory.
+    os.environ.setdefault("GROQ_FAKE", "1")
+    os.environ.setdefault("GROQ_API_KEY", "benchmark")
+    workdir = workdir or tempfile.mkdtemp(prefix="michelin-bench-")
+    out = os.path.abspath(out)
+    os.makedirs(os.path.join(workdir, "data"), exist_ok=True)
+    os.chdir(workdir)
+    import app
+
+    baseline = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "repeat": repeat,
+        "seed": seed,
+        "results": {},
+    }
+    for rows in sizes:
+        print(f"{rows:,} restaurants", file=sys.stderr)
+        results = run_size(app, rows, repeat, seed)
+        baseline["results"][str(rows)] = results
+        for name, t in results.items():
+            print(f"  {name:<28} {t['min_ms']:10.2f} ms  (median {t['median_ms']:.2f})", file=sys.stderr)
+
+    with open(out, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Wrote {out}", file=sys.stderr)
+    return baseline
+
+
+def compare(old, new, threshold) -> bool:
+    """Prints the change of every case between two baselines; False if one got slower than `threshold`."""
+    ok = True
+    for rows, results in new["results"].items():
+        print(f"{int(rows):,} restaurants ({old.get('commit')} -> {new.get('commit')})")
+        for name, t in results.items():
+            before = old["results"].get(rows, {}).get(name)
+            if before is None:
+                continue
+            ratio = t["min_ms"] / before["min_ms"] if before["min_ms"] else float("inf")
+            flag = "  SLOWER" if ratio > threshold else ""
+            ok &= ratio <= threshold
+            print(f"  {name:<28} {before['min_ms']:10.2f} -> {t['min_ms']:10.2f} ms  {ratio:5.2f}x{flag}")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the app's callbacks on synthetic datasets and write a JSON baseline.")
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmarks/baseline.json")
+    parser.add_argument("--workdir", help="Where the synthetic data is written, a new temporary directory by default.")
+    parser.add_argument("--compare", help="An earlier baseline to compare against.")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="Exit with an error if a case is this many times slower than in --compare.")
+    args = parser.parse_args()
+
+    old = None
+    if args.compare:
+        with open(args.compare) as f:
+            old = json.load(f)
+    new = main(args.rows, args.repeat, args.seed, args.out, args.workdir)
+    if old is not None and not compare(old, new, args.threshold):
+        sys.exit(1)
@@ -0,0 +1,37 @@
+import argparse
+import timeit
+
+import numpy as np
+from geopy import distance
+
+from modules.dataset import load_dataset
+from modules.geo import great_circle_km
+
+
+def geopy_km(lat, lon, lats, lons):
+    return np.array([distance.great_circle((lat, lon), (a, b)).km for a, b in zip(lats, lons)])
+
+
+def main(repeat=5, batch=100):
+    df = load_dataset().df
+    lats, lons = df["Latitude"].to_numpy(), df["Longitude"].to_numpy()
+    lat, lon = lats[0], lons[0]
+
+    error = np.abs(great_circle_km(lat, lon, lats, lons) - geopy_km(lat, lon, lats, lons)).max()
+    geopy_s = min(timeit.repeat(lambda: geopy_km(lat, lon, lats, lons), number=1, repeat=repeat))
+    kernel_s = min(timeit.repeat(lambda: great_circle_km(lat, lon, lats, lons), number=1, repeat=repeat))
+    batch_s = min(timeit.repeat(lambda: great_circle_km(lats[:batch], lons[:batch], lats, lons), number=1, repeat=repeat))
+
+    print(f"restaurants:            {len(df):,}")
+    print(f"max abs difference:     {error:.2e} km")
+    print(f"geopy great_circle:     {geopy_s * 1e3:10.3f} ms")
+    print(f"great_circle_km:        {kernel_s * 1e3:10.3f} ms  ({geopy_s / kernel_s:,.0f}x)")
+    print(f"great_circle_km x{batch:<5} {batch_s * 1e3:10.3f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the NumPy great-circle kernel with geopy on the full dataset.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=100)
+    args = parser.parse_args()
+    main(args.repeat, args.batch)
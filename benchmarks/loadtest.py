@@ -0,0 +1,275 @@
+import argparse
+import collections
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import requests
+
+PARIS = {"lat": 48.857, "lon": 2.352}
+
+
+class Callback:
+    """Builds `_dash-update-component` bodies for one callback from its `_dash-dependencies` entry."""
+
+    def __init__(self, dependency):
+        self.output = dependency["output"]
+        self.inputs = [i["id"] + "." + i["property"] for i in dependency["inputs"]]
+        self.state = [s["id"] + "." + s["property"] for s in dependency["state"]]
+
+    @staticmethod
+    def _prop(name, value):
+        id, prop = name.rsplit(".", 1)
+        return {"id": id, "property": prop, "value": value}
+
+    def _outputs(self):
+        multi = self.output.startswith("..")
+        outputs = []
+        for output in self.output.strip(".").split("..."):
+            id, prop = output.rsplit(".", 1)
+            outputs.append({"id": id, "property": prop.split("@")[0]})
+        return outputs if multi else outputs[0]
+
+    def body(self, inputs, state=None):
+        state = state or {}
+        return {
+            "output": self.output,
+            "outputs": self._outputs(),
+            "inputs": [self._prop(name, inputs.get(name)) for name in self.inputs],
+            "state": [self._prop(name, state.get(name)) for name in self.state],
+            "changedPropIds": [name for name in self.inputs if name in inputs][:1],
+        }
+
+
+def load_callbacks(url) -> dict:
+    dependencies = requests.get(f"{url}/_dash-dependencies", timeout=30).json()
+
+    def find(output, trigger):
+        for dependency in dependencies:
+            first = dependency["inputs"][0]
+            if (dependency["output"].strip(".").startswith(output) and not dependency.get("clientside_function")
+                    and f"{first['id']}.{first['property']}" == trigger):
+                return Callback(dependency)
+        raise KeyError(f"{trigger} -> {output}")
+
+    return {
+        "display_page": find("data-store.data", "url.search"),
+        "stats": find("stats-countries.children", "data-store.data"),
+        "filter_options": find("filter-award.data", "data-store.data"),
+        "map_view": find("map-fig.figure", "map-fig.relayoutData"),
+        "modal": find("restaurant-description.children", "data-store.data"),
+        "plan_my_day": find("plan-my-day-drawer.opened", "plan-my-day-btn.n_clicks"),
+        "alternatives": find("alternatives-drawer.opened", "alternatives-btn.n_clicks"),
+    }
+
+
+class Recorder:
+    """Latencies and errors per request label, shared by all virtual users."""
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+    def report(self, elapsed) -> dict:
+        report = {}
+        for label, latencies in sorted(self.latencies.items()):
+            ms = np.array(latencies) * 1e3
+            report[label] = {
+                "requests": len(ms),
+                "per_second": len(ms) / elapsed,
+                "error_rate": self.errors[label] / len(ms),
+                "p50_ms": float(np.percentile(ms, 50)),
+                "p95_ms": float(np.percentile(ms, 95)),
+                "p99_ms": float(np.percentile(ms, 99)),
+            }
+        return report
+
+
+class User:
+    """One browser session: lands on the map, zooms in, clicks restaurants, then visits the analytics pages."""
+
+    def __init__(self, url, callbacks, recorder, llm=True):
+        self.url = url
+        self.callbacks = callbacks
+        self.recorder = recorder
+        self.llm = llm
+        self.http = requests.Session()
+        self.etags = {}
+
+    def _timed(self, label, method, path, ok_status=(200, 204), **kwargs):
+        start = time.perf_counter()
+        try:
+            response = self.http.request(method, self.url + path, timeout=120, **kwargs)
+            ok = response.status_code in ok_status
+        except requests.RequestException:
+            response, ok = None, False
+        self.recorder.record(label, time.perf_counter() - start, ok)
+        return response if ok else None
+
+    def callback(self, label, inputs, state=None):
+        response = self._timed(label, "POST", "/_dash-update-component",
+                               json=self.callbacks[label].body(inputs, state))
+        if response is None or response.status_code == 204:
+            return None
+        return response.json().get("response", {})
+
+    def figure(self, name, version):
+        headers = {"If-None-Match": self.etags[name]} if name in self.etags else {}
+        response = self._timed(f"figure:{name}", "GET", f"/figures/{name}.json?v={version}",
+                               ok_status=(200, 304), headers=headers)
+        if response is not None and response.headers.get("ETag"):
+            self.etags[name] = response.headers["ETag"]
+
+    def stream(self, kind, rid):
+        start = time.perf_counter()
+        ok = False
+        try:
+            with self.http.get(f"{self.url}/llm/{kind}/{rid}", stream=True, timeout=120) as response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line == "event: done":
+                        ok = True
+                    if line in ("event: done", "event: failed"):
+                        break
+        except requests.RequestException:
+            pass
+        self.recorder.record(f"llm:{kind}", time.perf_counter() - start, ok)
+
+    def session(self):
+        landing = self.callback("display_page", {"url.search": ""})
+        version = (landing or {}).get("data-store", {}).get("data")
+        if version is None:
+            return
+        self.figure("map", version)
+        self.callback("stats", {"data-store.data": version, "map-filter.data": None})
+        self.callback("filter_options", {"data-store.data": version})
+
+        center = {"lat": PARIS["lat"] + random.uniform(-0.1, 0.1), "lon": PARIS["lon"] + random.uniform(-0.1, 0.1)}
+        view = None
+        rids = []
+        for zoom in (6, 9, 11):
+            patch = self.callback("map_view", {"map-fig.relayoutData": {"map.zoom": zoom, "map.center": center}},
+                                  {"map-view.data": view, "map-filter.data": None})
+            if not patch:
+                continue
+            view = patch.get("map-view", {}).get("data", view)
+            for operation in patch.get("map-fig", {}).get("figure", {}).get("operations", []):
+                if operation["location"][-1] == "customdata" and operation["operation"] == "Extend":
+                    rids += [point[0] for point in operation["params"]["value"]]
+
+        for rid in random.sample(rids, min(3, len(rids))):
+            self.callback("modal", {"data-store.data": version, "map-fig.clickData": {"points": [{"customdata": [rid, ""]}]}})
+            self.callback("alternatives", {"alternatives-btn.n_clicks": 1, "click-data.data": rid, "data-store.data": version},
+                          {"map-filter.data": None})
+        if rids and self.llm:
+            rid = random.choice(rids)
+            self.callback("plan_my_day", {"plan-my-day-btn.n_clicks": 1, "click-data.data": rid})
+            self.stream("day-plan", rid)
+
+        # Sorting the countries happens in the browser; only the figure is requested.
+        for name in ("countries", "cuisines"):
+            self.callback("display_page", {"url.search": ""})
+            self.figure(name, version)
+
+
+def run_stage(url, callbacks, concurrency, duration, llm) -> dict:
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    sessions = []
+
+    def loop():
+        user = User(url, callbacks, recorder, llm)
+        count = 0
+        while time.monotonic() < deadline:
+            user.session()
+            count += 1
+        sessions.append(count)
+
+    threads = [threading.Thread(target=loop) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    requests_total = sum(len(v) for v in recorder.latencies.values())
+    return {
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "sessions": sum(sessions),
+        "requests_per_second": requests_total / elapsed,
+        "error_rate": sum(recorder.errors.values()) / requests_total if requests_total else 0.0,
+        "callbacks": recorder.report(elapsed),
+    }
+
+
+def print_stage(stage):
+    print(f"concurrency {stage['concurrency']}: {stage['requests_per_second']:.1f} req/s, "
+          f"{stage['sessions']} sessions, {stage['error_rate']:.1%} errors")
+    for label, s in stage["callbacks"].items():
+        print(f"  {label:<18} {s['requests']:6d} req {s['per_second']:8.1f}/s  p50 {s['p50_ms']:8.1f}  "
+              f"p95 {s['p95_ms']:8.1f}  p99 {s['p99_ms']:8.1f} ms  errors {s['error_rate']:.1%}")
+
+
+def spawn_server(url, groq_latency, workers):
+    """Starts gunicorn with the fake Groq client and waits until it answers."""
+    env = dict(os.environ, GROQ_FAKE="1", GROQ_FAKE_LATENCY=str(groq_latency), GUNICORN_WORKERS=str(workers))
+    bind = url.split("://", 1)[-1]
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", bind, "app:server"],
+                              env=env)
+    for _ in range(120):
+        try:
+            requests.get(f"{url}/_dash-dependencies", timeout=1)
+            return server
+        except requests.RequestException:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError(f"gunicorn did not start on {bind}")
+
+
+def main(url, concurrency, duration, llm=True, out=None, spawn=False, groq_latency=0.5, workers=2):
+    server = spawn_server(url, groq_latency, workers) if spawn else None
+    try:
+        callbacks = load_callbacks(url)
+        stages = []
+        for n in concurrency:
+            stage = run_stage(url, callbacks, n, duration, llm)
+            print_stage(stage)
+            stages.append(stage)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    if out:
+        with open(out, "w") as f:
+            json.dump({"url": url, "duration": duration, "stages": stages}, f, indent=2)
+    return stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replay user sessions against a running app at increasing concurrency. "
+                    "Start the server with GROQ_FAKE=1 (and GROQ_FAKE_LATENCY) or pass --spawn.")
+    parser.add_argument("--url", default="http://127.0.0.1:8071")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--duration", type=float, default=30, help="Seconds per concurrency level.")
+    parser.add_argument("--no-llm", action="store_true", help="Skip the day plan stream.")
+    parser.add_argument("--out", help="Write the results as JSON.")
+    parser.add_argument("--spawn", action="store_true", help="Start gunicorn with the fake Groq client for the run.")
+    parser.add_argument("--groq-latency", type=float, default=0.5, help="Seconds per fake Groq answer with --spawn.")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn workers with --spawn.")
+    args = parser.parse_args()
+
+    main(args.url, args.concurrency, args.duration, not args.no_llm, args.out, args.spawn, args.groq_latency,
+         args.workers)
@@ -0,0 +1,142 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from modules.enrichment import AWARDS
+
+# Countries as they appear in the guide's Location column, with their share of
+# the guide's restaurants, price symbol and a few cities (name, lat, lon).
+COUNTRIES = [
+    ("France", 20.0, "€", [("Paris", 48.857, 2.352), ("Lyon", 45.764, 4.836), ("Marseille", 43.297, 5.370),
+                           ("Bordeaux", 44.838, -0.579), ("Nice", 43.710, 7.262)]),
+    ("Italy", 12.0, "€", [("Rome", 41.903, 12.496), ("Milan", 45.464, 9.190), ("Florence", 43.770, 11.256),
+                          ("Naples", 40.852, 14.268)]),
+    ("Spain", 7.5, "€", [("Madrid", 40.417, -3.704), ("Barcelona", 41.385, 2.173), ("San Sebastián", 43.318, -1.981)]),
+    ("Japan", 7.5, "¥", [("Tokyo", 35.676, 139.650), ("Kyoto", 35.012, 135.768), ("Osaka", 34.694, 135.502)]),
+    ("Germany", 6.0, "€", [("Berlin", 52.520, 13.405), ("Munich", 48.135, 11.582), ("Hamburg", 53.551, 9.994)]),
+    ("USA", 6.0, "$", [("New York", 40.713, -74.006), ("San Francisco", 37.775, -122.419), ("Chicago", 41.878, -87.630),
+                       ("Los Angeles", 34.052, -118.244)]),
+    ("United Kingdom", 5.5, "£", [("London", 51.507, -0.128), ("Edinburgh", 55.953, -3.188), ("Manchester", 53.481, -2.243)]),
+    ("Belgium", 3.5, "€", [("Brussels", 50.850, 4.352), ("Antwerp", 51.219, 4.402)]),
+    ("Switzerland", 3.0, "€", [("Zurich", 47.377, 8.542), ("Geneva", 46.204, 6.143)]),
+    ("Netherlands", 3.0, "€", [("Amsterdam", 52.368, 4.904), ("Rotterdam", 51.924, 4.478)]),
+    ("China Mainland", 2.5, "¥", [("Shanghai", 31.230, 121.474), ("Beijing", 39.904, 116.407), ("Guangzhou", 23.129, 113.264)]),
+    ("Thailand", 2.5, "฿", [("Bangkok", 13.756, 100.502), ("Chiang Mai", 18.788, 98.985)]),
+    ("Portugal", 2.0, "€", [("Lisbon", 38.722, -9.139), ("Porto", 41.158, -8.629)]),
+    ("Austria", 2.0, "€", [("Vienna", 48.208, 16.374), ("Salzburg", 47.810, 13.055)]),
+    ("Hong Kong SAR China", 1.5, "$", [("Hong Kong", 22.320, 114.170)]),
+    ("Taiwan", 1.5, "$", [("Taipei", 25.033, 121.565), ("Tainan", 22.999, 120.227)]),
+    ("Singapore", 1.5, "$", [("Singapore", 1.352, 103.820)]),
+    ("South Korea", 1.2, "₩", [("Seoul", 37.567, 126.978), ("Busan", 35.180, 129.076)]),
+    ("Denmark", 1.0, "€", [("Copenhagen", 55.676, 12.568)]),
+    ("Sweden", 1.0, "€", [("Stockholm", 59.329, 18.069)]),
+    ("Mexico", 1.0, "$", [("Mexico City", 19.433, -99.133)]),
+    ("Canada", 1.0, "$", [("Toronto", 43.653, -79.383), ("Vancouver", 49.283, -123.121)]),
+    ("Türkiye", 0.8, "₺", [("Istanbul", 41.008, 28.978)]),
+    ("Vietnam", 0.6, "₫", [("Hanoi", 21.028, 105.834), ("Ho Chi Minh City", 10.823, 106.630)]),
+    ("Dubai", 0.6, "$", [("Dubai", 25.205, 55.271)]),
+    ("Czechia", 0.3, "€", [("Prague", 50.076, 14.438)]),
+]
+
+# Share of each award in AWARDS, and the price levels 1 to 4 within each award.
+AWARD_SHARES = [0.009, 0.030, 0.155, 0.190, 0.616]
+PRICE_SHARES = [
+    [0.00, 0.00, 0.05, 0.95],
+    [0.00, 0.00, 0.15, 0.85],
+    [0.00, 0.05, 0.45, 0.50],
+    [0.30, 0.60, 0.10, 0.00],
+    [0.25, 0.40, 0.25, 0.10],
+]
+
+CUISINES = [
+    "Modern Cuisine", "Creative", "French", "Classic Cuisine", "Italian", "Japanese", "Sushi", "Seafood",
+    "Contemporary", "Traditional Cuisine", "Mediterranean Cuisine", "Regional Cuisine", "Farm to table",
+    "Cantonese", "Thai", "Korean", "Spanish", "Tapas", "Steakhouse", "Market Cuisine", "Country cooking",
+    "Innovative", "Vegetarian", "Fusion", "Italian Contemporary", "Street Food", "Teppanyaki", "Tempura",
+    "Kaiseki", "Noodles", "Dim Sum", "Peruvian", "Mexican", "Indian", "Scandinavian", "Grills", "Barbecue",
+    "Modern British", "Classic French", "Asian",
+]
+
+FACILITIES = [
+    "Air conditioning", "Car park", "Great view", "Terrace", "Wheelchair access", "Interesting wine list",
+    "Garden or park", "Counter dining", "Brunch", "Restaurant offering vegetarian menus", "Valet parking",
+    "Cash only", "Notable sake list", "Private dining room",
+]
+
+DESCRIPTIONS = [
+    "A bright dining room where seasonal produce takes centre stage.",
+    "The chef's tasting menu showcases local ingredients with precision and flair.",
+    "A friendly neighbourhood spot serving generous, honest cooking.",
+    "Refined dishes in an elegant setting, with attentive and knowledgeable service.",
+    "Bold flavours and creative combinations in a relaxed, modern space.",
+]
+
+
+def _choice(rng, values, n, p=None):
+    values = np.asarray(values, dtype=object)
+    return values[rng.choice(len(values), size=n, p=p)]
+
+
+def generate(n, seed=0) -> pd.DataFrame:
+    """`n` synthetic restaurants with the columns of michelin_by_Jerry_Ng.csv."""
+    rng = np.random.default_rng(seed)
+    weights = np.array([c[1] for c in COUNTRIES])
+    country = rng.choice(len(COUNTRIES), size=n, p=weights / weights.sum())
+    city = (rng.random(n) * np.array([len(c[3]) for c in COUNTRIES])[country]).astype(int)
+    places = [(c[0], c[2], *place) for c in COUNTRIES for place in c[3]]
+    offsets = np.cumsum([0] + [len(c[3]) for c in COUNTRIES])[:-1]
+    place = offsets[country] + city
+    country_names, symbols, city_names, lats, lons = (np.array(v, dtype=object) for v in zip(*places))
+
+    # Most restaurants are in town, the others spread over the region.
+    spread = np.where(rng.random(n) < 0.7, 0.05, 1.0)
+    lat = np.clip(lats[place].astype(float) + rng.normal(0, spread), -85, 85)
+    lon = (lons[place].astype(float) + rng.normal(0, spread) + 180) % 360 - 180
+
+    award = rng.choice(len(AWARDS), size=n, p=AWARD_SHARES)
+    level = np.empty(n, dtype=int)
+    for code, shares in enumerate(PRICE_SHARES):
+        rows = award == code
+        level[rows] = rng.choice(4, size=rows.sum(), p=shares) + 1
+    price = pd.Series(symbols[place]) * level
+    price[rng.random(n) < 0.01] = np.nan
+
+    cuisine = pd.Series(_choice(rng, CUISINES, n))
+    second = rng.random(n) < 0.3
+    cuisine[second] = cuisine[second] + ", " + _choice(rng, CUISINES, second.sum())
+
+    # A few hundred distinct facility lists, as in the guide, some of them empty.
+    combos = [",".join(sorted(rng.choice(FACILITIES, size=rng.integers(1, 6), replace=False)))
+              for _ in range(300)]
+    facilities = pd.Series(_choice(rng, combos, n))
+    facilities[rng.random(n) < 0.05] = np.nan
+
+    ids = pd.Series(np.arange(n)).astype(str)
+    return pd.DataFrame({
+        "Name": "Restaurant " + ids,
+        "Address": pd.Series(rng.integers(1, 200, n)).astype(str) + " Main Street",
+        "Location": pd.Series(city_names[place]) + ", " + pd.Series(country_names[place]),
+        "Price": price,
+        "Cuisine": cuisine,
+        "Longitude": lon,
+        "Latitude": lat,
+        "PhoneNumber": "+1 555 " + ids.str.zfill(7),
+        "Url": "https://guide.michelin.com/en/restaurant/" + ids,
+        "WebsiteUrl": "https://restaurant-" + ids + ".example.com",
+        "Award": np.array(AWARDS, dtype=object)[award],
+        "GreenStar": (rng.random(n) < 0.03).astype(int),
+        "FacilitiesAndServices": facilities,
+        "Description": _choice(rng, DESCRIPTIONS, n),
+    })
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic Michelin-like CSV.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="data/synthetic.csv")
+    args = parser.parse_args()
+
+    generate(args.rows, args.seed).to_csv(args.out, index=False)
+    print(f"Wrote {args.rows:,} restaurants to {args.out}")
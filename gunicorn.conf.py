@@ -0,0 +1,74 @@
+import gc
+import glob
+import os
+import shutil
+import tempfile
+
+bind = "0.0.0.0:8071"
+
+# Threaded workers, so a request waiting on Groq holds a thread rather than a
+# whole worker. LLM_MAX_CONCURRENCY in modules/helpers.py must stay below
+# `threads`, which on_starting checks.
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+timeout = 120
+
+# Import the app and load the dataset in the master, so the workers share its
+# pages copy-on-write instead of each loading their own. Set GUNICORN_PRELOAD=0
+# to load per worker, e.g. to compare memory use.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+# Every process writes its metrics to files here, so that /metrics reports all
+# of them whichever worker answers it. A new directory per run unless set; a
+# given one is emptied now, before the preloaded app opens its files.
+own_metrics_dir = "PROMETHEUS_MULTIPROC_DIR" not in os.environ
+if own_metrics_dir:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="michelin-metrics-")
+metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+os.makedirs(metrics_dir, exist_ok=True)
+for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+    os.remove(path)
+
+
+def on_starting(server):
+    from modules.helpers import LLM_MAX_CONCURRENCY
+    # server.cfg also holds --threads given on the command line.
+    if server.cfg.threads <= LLM_MAX_CONCURRENCY:
+        raise RuntimeError(f"gunicorn threads ({server.cfg.threads}) must be above LLM_MAX_CONCURRENCY "
+                           f"({LLM_MAX_CONCURRENCY}), or Groq streams can take every thread of a worker")
+
+
+def when_ready(server):
+    from modules.process_memory import format_usage, memory_usage
+    if preload_app:
+        from modules.dataset import get_dataset
+        from modules.figure_cache import figure_cache
+        dataset = get_dataset()
+        # The app registered its figures when it was imported; serialize them
+        # here so the workers inherit them instead of each building its own.
+        for name in figure_cache.builders:
+            figure_cache.get(name, dataset)
+        # Objects that exist now are never collected; keeping the collector
+        # away from them keeps their pages shared with the workers.
+        gc.freeze()
+        server.log.info("Preloaded dataset %s with %d restaurants and figures %s", dataset.version, len(dataset.df),
+                        ", ".join(figure_cache.builders))
+    server.log.info("Master memory: %s", format_usage(memory_usage()))
+
+
+def post_worker_init(worker):
+    from modules.dataset import get_dataset
+    from modules.process_memory import format_usage, memory_usage
+    get_dataset()
+    worker.log.info("Worker %s memory: %s", worker.pid, format_usage(memory_usage()))
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if own_metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
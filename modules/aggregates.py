@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from modules.enrichment import AWARDS
+
+# Column of each award in the per-country table, in AWARDS order.
+AWARD_COLUMNS = ["stars_3_sum", "stars_2_sum", "stars_1_sum", "bib_sum", "selected_sum"]
+
+
+def country_table(df:pd.DataFrame) -> pd.DataFrame:
+    """One row per country with its award counts, restaurant count, mean price and population.
+
+    Built once per dataset; sorting it for a chart only reorders these few rows.
+    """
+    awards = (pd.crosstab(df["country"], df["Award"])
+                .reindex(columns=AWARDS, fill_value=0)
+                .set_axis(AWARD_COLUMNS, axis=1))
+    countries = (df.groupby("country", observed=True)
+                   .agg(restaurants_count=("Name", "count"),
+                        population=("population", "first"),
+                        mean_price=("Price", "mean"),
+                        stars_sum=("stars", "sum")))
+    table = awards.join(countries, how="inner")
+    table["stars_per_million"] = table["stars_sum"] / table["population"] * 1e6
+    table.index = table.index.astype(str)
+    return table
+
+
+class Summary:
+    """Headline counts of the dataset, or of a filtered part of it.
+
+    Award and country codes are combined into one code per restaurant, so the
+    counts for any subset come from a single bincount. The counts of the whole
+    dataset are computed once.
+    """
+
+    def __init__(self, df:pd.DataFrame):
+        self.awards = list(df["Award"].cat.categories)
+        # Shifted by one so that missing values (code -1) get a bin of their own.
+        award_codes = df["Award"].cat.codes.to_numpy().astype(np.int64) + 1
+        country_codes = df["country"].cat.codes.to_numpy().astype(np.int64) + 1
+        self.n_countries = len(df["country"].cat.categories) + 1
+        self.codes = award_codes * self.n_countries + country_codes
+        self.total = self._count(self.codes)
+
+    def counts(self, mask=None) -> dict:
+        """Number of countries, restaurants and restaurants per award among those selected by `mask`."""
+        return self.total if mask is None else self._count(self.codes[mask])
+
+    def _count(self, codes:np.ndarray) -> dict:
+        table = np.bincount(codes, minlength=(len(self.awards) + 1) * self.n_countries)
+        table = table.reshape(len(self.awards) + 1, self.n_countries)
+        per_award = table.sum(axis=1)
+        return {
+            "countries": int((table[:, 1:].sum(axis=0) > 0).sum()),
+            "restaurants": int(len(codes)),
+            **{award: int(per_award[code + 1]) for code, award in enumerate(self.awards)},
+        }
@@ -0,0 +1,240 @@
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+
+# Figures of the analytics pages. They depend only on the dataset, so they are
+# built once per dataset version, and ahead of time by `python -m modules.build_data`.
+
+# Columns of modules.aggregates.country_table the countries can be sorted by.
+COUNTRY_SORT_OPTIONS = [
+    ["stars_3_sum", "Stars"],
+    ["restaurants_count", "Restaurants"],
+    ["population", "Population"],
+    ["stars_per_million", "Stars per Capita"],
+    ["mean_price", "Price"],
+]
+
+
+def build_country_figure(dataset):
+    df_country = dataset.countries.reset_index()
+
+    fig = make_subplots(
+        rows=8,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.05,
+        subplot_titles=[
+            "3 Stars",
+            "2 Stars",
+            "1 Star",
+            "Bib Gourmand",
+            "Selected Restaurant",
+            "Sum of Restaurants",
+            "Price",
+            "Population",
+        ]
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.stars_3_sum,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='3 Stars',
+        ), row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.stars_2_sum,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='2 Stars',
+        ), row=2, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.stars_1_sum,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='1 Stars',
+        ), row=3, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.bib_sum,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='Bib Gourmand',
+        ), row=4, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.selected_sum,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='Selected Restaurant',
+        ), row=5, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.restaurants_count,
+            hovertemplate=f'<b>%{{x}}</b><br>Restaurants: %{{y}}',
+            name=f'Sum of Restaurants',
+            showlegend=True,
+        ), row=6, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.mean_price,
+            hovertemplate=f'<b>%{{x}}</b><br>Price Niveau: %{{y}}',
+            name=f'Mean Price',
+            showlegend=True,
+        ), row=7, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=df_country.country,
+            y=df_country.population,
+            hovertemplate=f'<b>%{{x}}</b><br>Population: %{{y}}',
+            name=f'Population',
+            showlegend=True,
+        ), row=8, col=1
+    )
+
+    fig.update_layout(
+        title_text="Stars and Restaurants per Country",
+        title_x=0.5,
+        height=8*200,
+        showlegend=False,
+        barcornerradius=7,
+        barmode='stack',
+        template="plotly_white",
+    )
+    fig.update_xaxes(row=1, col=1, showticklabels=False)
+    fig.update_xaxes(row=2, col=1, showticklabels=False)
+    fig.update_xaxes(row=3, col=1, showticklabels=False)
+    fig.update_xaxes(row=4, col=1, showticklabels=False)
+    fig.update_xaxes(row=5, col=1, showticklabels=False)
+    fig.update_xaxes(row=6, col=1, showticklabels=False)
+    fig.update_xaxes(row=7, col=1, showticklabels=False)
+    fig.update_xaxes(row=8, col=1, showticklabels=True)
+    fig.update_yaxes(title_text="Restaurants", row=1, col=1)
+    fig.update_yaxes(title_text="Restaurants", row=2, col=1)
+    fig.update_yaxes(title_text="Restaurants", row=3, col=1)
+    fig.update_yaxes(title_text="Restaurants", row=4, col=1)
+    fig.update_yaxes(title_text="Restaurants", row=5, col=1)
+    fig.update_yaxes(title_text="Restaurants", row=6, col=1)
+    fig.update_yaxes(title_text="Mean Price Niveau", row=7, col=1)
+    fig.update_yaxes(title_text="Population", row=8, col=1)
+    # The browser orders the countries from this table, see assets/analytics.js.
+    fig.update_xaxes(categoryorder="array")
+    fig.update_layout(meta={"countries": df_country[["country", *[k for k, _ in COUNTRY_SORT_OPTIONS]]].to_dict("list")})
+    return fig
+
+
+def build_cuisine_figure(dataset):
+    cuisines = dataset.cuisines
+    most_frequent_words_3star = cuisines.counts("3 Stars")
+    most_frequent_words_2star = cuisines.counts("2 Stars")
+    most_frequent_words_1star = cuisines.counts("1 Star")
+    most_frequent_words_bib = cuisines.counts("Bib Gourmand")
+    most_frequent_words_selected = cuisines.counts("Selected Restaurants")
+    most_frequent_words_all = cuisines.counts()
+
+    fig = make_subplots(
+        rows=6,
+        cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.05,
+        subplot_titles=[
+            "3 Stars",
+            "2 Stars",
+            "1 Star",
+            "Bib Gourmand",
+            "Selected Restaurant",
+            "All Restaurants",
+        ]
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_3star.index,
+            y=most_frequent_words_3star.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='3 Stars',
+        ), row=1, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_2star.index,
+            y=most_frequent_words_2star.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='2 Stars',
+        ), row=2, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_1star.index,
+            y=most_frequent_words_1star.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='1 Stars',
+        ), row=3, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_bib.index,
+            y=most_frequent_words_bib.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='Bib Gourmand',
+        ), row=4, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_selected.index,
+            y=most_frequent_words_selected.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='Selected Restaurants',
+        ), row=5, col=1
+    )
+    fig.add_trace(
+        go.Bar(
+            x=most_frequent_words_all.index,
+            y=most_frequent_words_all.values,
+            hovertemplate='<b>%{x}</b><br>Restaurants: %{y}',
+            name='All Restaurants',
+        ), row=6, col=1
+    )
+
+    fig.update_layout(
+        title_text="Words used to describe Cuisines",
+        title_x=0.5,
+        height=6*200,
+        barcornerradius=7,
+        showlegend=False,
+        template="plotly_white",
+    )
+    fig.update_xaxes(row=1, col=1, showticklabels=False, range=[-1, 51])
+    fig.update_xaxes(row=2, col=1, showticklabels=False, range=[-1, 51])
+    fig.update_xaxes(row=3, col=1, showticklabels=False, range=[-1, 51])
+    fig.update_xaxes(row=4, col=1, showticklabels=False, range=[-1, 51])
+    fig.update_xaxes(row=5, col=1, showticklabels=False, range=[-1, 51])
+    fig.update_xaxes(row=6, col=1, showticklabels=True, range=[-1, 51])
+    fig.update_yaxes(title_text="count", row=1, col=1)
+    fig.update_yaxes(title_text="count", row=2, col=1)
+    fig.update_yaxes(title_text="count", row=3, col=1)
+    fig.update_yaxes(title_text="count", row=4, col=1)
+    fig.update_yaxes(title_text="count", row=5, col=1)
+    fig.update_yaxes(title_text="count", row=6, col=1)
+    return fig
+
+
+ANALYTICS_FIGURES = {
+    "countries": build_country_figure,
+    "cuisines": build_cuisine_figure,
+}
+
+
+def register_figures(cache):
+    """Registers the analytics figures with a FigureCache, by the names `/figures/<name>.json` serves."""
+    for name, builder in ANALYTICS_FIGURES.items():
+        cache.register(name, builder)
@@ -0,0 +1,23 @@
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+SOURCE_HASH_KEY = b"source_sha256"
+
+
+def write_artifact(df:pd.DataFrame, path, source_hash:str):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = {**(table.schema.metadata or {}), SOURCE_HASH_KEY: source_hash.encode()}
+    # Uncompressed, so that reading maps the columns instead of decompressing them.
+    feather.write_feather(table.replace_schema_metadata(metadata), path, compression="uncompressed")
+
+
+def read_artifact(path):
+    """Memory-map the artifact and return the frame with the hash of the CSV it was built from.
+
+    Numeric columns without nulls are read-only views of the mapped file, so
+    every process reading the same artifact shares one copy in the page cache.
+    """
+    table = feather.read_table(path, memory_map=True)
+    source_hash = (table.schema.metadata or {}).get(SOURCE_HASH_KEY, b"").decode()
+    return table.to_pandas(split_blocks=True), source_hash
@@ -0,0 +1,37 @@
+import argparse
+
+import pandas as pd
+
+from modules.analytics_figures import ANALYTICS_FIGURES, register_figures
+from modules.artifact import write_artifact
+from modules.dataset import Dataset, file_hash
+from modules.enrichment import categorize, enrich
+from modules.figure_cache import figure_cache
+from modules.helpers import *
+
+
+def build(csv_path=DATA_PATH, artifact_path=ARTIFACT_PATH):
+    df = categorize(enrich(pd.read_csv(csv_path)))
+    source_hash = file_hash(csv_path)
+    write_artifact(df, artifact_path, source_hash)
+    return df, source_hash
+
+
+def prerender(df, source_hash):
+    """Writes the analytics figures for this dataset version."""
+    register_figures(figure_cache)
+    return figure_cache.prerender(Dataset(df, source_hash[:16]), list(ANALYTICS_FIGURES))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the columnar dataset artifact and the analytics figures from the Michelin CSV.")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--out", default=ARTIFACT_PATH)
+    parser.add_argument("--figures", default=FIGURES_DIR)
+    args = parser.parse_args()
+
+    df, source_hash = build(args.csv, args.out)
+    print(f"Wrote {len(df):,} restaurants to {args.out} (source {source_hash[:16]})")
+    figure_cache.directory = args.figures
+    for path in prerender(df, source_hash):
+        print(f"Wrote {path}")
@@ -0,0 +1,53 @@
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS content (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    city TEXT NOT NULL,
+    model TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (kind, name, city)
+);
+"""
+
+
+class ContentStore:
+    """Pre-generated LLM content per (kind, restaurant name, city), written by `python -m modules.warmup`."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # A connection must not survive a fork: the app is imported in the
+        # gunicorn master, so the schema is created on one that is closed at
+        # once, and each thread of a worker opens its own on first use.
+        with contextlib.closing(sqlite3.connect(path, timeout=10, isolation_level=None)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, kind, name, city):
+        row = self._connect().execute(
+            "SELECT text FROM content WHERE kind = ? AND name = ? AND city = ?", (kind, name, city)).fetchone()
+        return None if row is None else row[0]
+
+    def set(self, kind, name, city, model, text):
+        self._connect().execute("INSERT OR REPLACE INTO content VALUES (?, ?, ?, ?, ?, ?)",
+                                (kind, name, city, model, text, time.time()))
+
+    def keys(self) -> set:
+        return set(self._connect().execute("SELECT kind, name, city FROM content").fetchall())
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from modules.inverted_index import InvertedIndex
+
+
+def tokenize(cuisine:pd.Series) -> pd.Series:
+    """Keywords of each cuisine description, one row per keyword, indexed like `cuisine`."""
+    return (cuisine.str.lower()
+                   .str.replace("cuisine", "")
+                   .str.split(",").explode()
+                   .str.strip()
+                   .str.split(" ").explode())
+
+
+class CuisineIndex:
+    """The cuisine keywords of every restaurant, tokenized once per dataset.
+
+    `tokens` has one row per keyword occurrence, in restaurant order, with the
+    restaurant id in `rid` and the keyword as a categorical `token`. Only the
+    distinct cuisine descriptions are tokenized; restaurants share the
+    keywords of their description. Keyword counts per award tier all come from
+    one grouped count, and are ordered exactly like `tokenize(...).value_counts()`
+    on the same restaurants, including the empty keyword.
+    """
+
+    def __init__(self, cuisine:pd.Series, award:pd.Series):
+        cuisine = cuisine.reset_index(drop=True).astype("category")
+        words = tokenize(pd.Series(cuisine.cat.categories, dtype=object)).dropna()
+        words = pd.DataFrame({"code": words.index, "token": words.to_numpy()})
+        rows = pd.DataFrame({"rid": np.arange(len(cuisine)), "code": cuisine.cat.codes.to_numpy()})
+        tokens = rows.merge(words, on="code")
+        tokens["token"] = pd.Categorical(tokens["token"], categories=tokens["token"].unique())
+        tokens["award"] = award.reset_index(drop=True).to_numpy()[tokens["rid"].to_numpy()]
+        self.tokens = tokens[["rid", "token", "award"]]
+        self.n = len(cuisine)
+        self.keywords = self.tokens["token"].cat.categories
+
+        counts = (self.tokens.assign(position=np.arange(len(self.tokens)))
+                             .groupby(["award", "token"], observed=True, dropna=False)
+                             .agg(count=("rid", "size"), first=("position", "min")))
+        self._counts = counts
+        self._totals = counts.groupby(level="token", observed=True).agg(count=("count", "sum"), first=("first", "min"))
+
+        self.index = InvertedIndex(self.tokens["rid"], self.tokens["token"])
+
+    @staticmethod
+    def _value_counts(counts:pd.DataFrame) -> pd.Series:
+        # value_counts lists keywords by first appearance before sorting by count.
+        counts = counts.sort_values("first")["count"]
+        return counts.rename_axis(None).rename("count").sort_values(ascending=False)
+
+    def counts(self, award=None) -> pd.Series:
+        """How often each keyword occurs among restaurants with `award`, or among all of them."""
+        if award is None:
+            return self._value_counts(self._totals)
+        if award not in self._counts.index.get_level_values("award"):
+            return pd.Series(dtype="int64", name="count")
+        return self._value_counts(self._counts.xs(award, level="award"))
+
+    def rids(self, keyword) -> np.ndarray:
+        """Ids of the restaurants whose cuisine contains `keyword`."""
+        return self.index.rids(keyword)
+
+    def mask(self, keyword) -> np.ndarray:
+        """Boolean mask over all restaurants, True where the cuisine contains `keyword`."""
+        return self.index.mask([keyword], self.n)
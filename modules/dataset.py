@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+
+from modules.aggregates import Summary, country_table
+from modules.artifact import read_artifact
+from modules.cuisine_index import CuisineIndex
+from modules.enrichment import categorize, enrich
+from modules.facets import FacetIndex
+from modules.helpers import *
+from modules.map_grid import MapGrid
+from modules.metrics import DATASET_LOAD_SECONDS
+from modules.records import RecordStore
+from modules.spatial import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+# Every session shares one frame, so a derived frame must never write back into
+# it. pandas >= 3 always behaves like this.
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def file_hash(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Dataset:
+    """The enriched restaurant frame shared by every session of this process.
+
+    `version` identifies the source data and is what the `data-store` carries
+    to the browser, so callbacks re-run when the data changes without the frame
+    itself ever being serialized. Indexes over the frame are built here, once
+    per load. A restaurant's id is its row position, which is also the frame's
+    index.
+    """
+
+    def __init__(self, df:pd.DataFrame, version:str, sources=None):
+        self.df = df.reset_index(drop=True)
+        self.version = version
+        self.sources = sources
+        self.records = RecordStore(self.df)
+        self.lat = self.df["Latitude"].to_numpy()
+        self.lon = self.df["Longitude"].to_numpy()
+        self.award_codes = self.df["Award"].cat.codes.to_numpy()
+        self.spatial = SpatialIndex(self.lat, self.lon)
+        self.grid = MapGrid(self.lat, self.lon, self.award_codes,
+                            max_zoom=MAP_CLUSTER_MAX_ZOOM - 1, cell_px=MAP_CLUSTER_CELL_PX)
+        self.countries = country_table(self.df)
+        self.summary = Summary(self.df)
+        self.cuisines = CuisineIndex(self.df["Cuisine"], self.df["Award"])
+        self.facets = FacetIndex(self.df, self.cuisines)
+        self._freeze()
+
+    def _freeze(self):
+        # The indexes are built once, before gunicorn forks when the app is
+        # preloaded. Read-only arrays keep a worker from writing to, and so
+        # copying, the pages it shares with the others.
+        arrays = [self.lat, self.lon, self.award_codes, self.summary.codes,
+                  self.grid.cx, self.grid.cy, self.grid.order, self.grid.sorted_keys,
+                  self.spatial.lat, self.spatial.lon]
+        for index in self.facets.indexes.values():
+            arrays += [index._rids, index._bounds]
+        for array in arrays:
+            array.flags.writeable = False
+
+
+def source_signature(path=DATA_PATH, artifact_path=ARTIFACT_PATH):
+    """Cheap fingerprint of the files a dataset is loaded from, used to notice when they change."""
+    signature = []
+    for p in (path, artifact_path):
+        try:
+            stat = os.stat(p)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_dataset(path=DATA_PATH, artifact_path=ARTIFACT_PATH) -> Dataset:
+    start = time.perf_counter()
+    sources = source_signature(path, artifact_path)
+    source_hash = file_hash(path) if os.path.exists(path) else None
+    if os.path.exists(artifact_path):
+        df, artifact_hash = read_artifact(artifact_path)
+        if source_hash in (None, artifact_hash):
+            dataset = Dataset(df, artifact_hash[:16], sources)
+            DATASET_LOAD_SECONDS.labels(source="artifact").observe(time.perf_counter() - start)
+            return dataset
+        logger.warning("%s is stale, loading %s instead. Rebuild it with `python -m modules.build_data`.",
+                       artifact_path, path)
+    df = categorize(enrich(pd.read_csv(path)))
+    dataset = Dataset(df, source_hash[:16], sources)
+    DATASET_LOAD_SECONDS.labels(source="csv").observe(time.perf_counter() - start)
+    return dataset
+
+
+_dataset = None
+_dataset_lock = threading.Lock()
+
+
+def get_dataset() -> Dataset:
+    global _dataset
+    if _dataset is None:
+        with _dataset_lock:
+            if _dataset is None:
+                _dataset = load_dataset()
+    return _dataset
+
+
+def refresh_dataset() -> Dataset:
+    """Like get_dataset, but reloads first if the CSV or the artifact changed on disk."""
+    global _dataset
+    dataset = get_dataset()
+    if dataset.sources != source_signature():
+        with _dataset_lock:
+            if _dataset is dataset:
+                logger.info("Dataset sources changed, reloading")
+                _dataset = load_dataset()
+    return _dataset
+
+
+def reset_dataset():
+    global _dataset
+    with _dataset_lock:
+        _dataset = None
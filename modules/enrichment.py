@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from modules.country_map import *
+
+AWARDS = ["3 Stars", "2 Stars", "1 Star", "Bib Gourmand", "Selected Restaurants"]
+
+# One entry per award in AWARDS plus a trailing default, so that the -1 code of
+# an unknown award picks the default.
+AWARD_SIZES = np.array([25, 20, 15, 7, 5, 5])
+AWARD_STARS = np.array([3, 2, 1, 0, 0, 0])
+
+
+def award_codes(award:pd.Series) -> np.ndarray:
+    return pd.Categorical(award, categories=AWARDS).codes
+
+
+def split_location(location:pd.Series):
+    city = location.str.split(",", n=1, expand=True)[0].str.strip()
+    parts = location.str.rsplit(",", n=1, expand=True)
+    country = parts[parts.columns[-1]].fillna(parts[0]).str.strip()
+    return city, country
+
+
+def price_level(price:pd.Series) -> pd.Series:
+    return price.astype("string").str.len().fillna(0).astype("int64")
+
+
+def enrich(df:pd.DataFrame) -> pd.DataFrame:
+    codes = award_codes(df["Award"])
+    city, country = split_location(df["Location"])
+    df["award_size"] = AWARD_SIZES[codes]
+    df["country"] = country.map(country_name_map)
+    df["city"] = city
+    df["stars"] = AWARD_STARS[codes]
+    df["country_codes"] = df.country.map(country_code_map)
+    df["population"] = df.country_codes.map(country_population_map)
+    df["Price"] = price_level(df["Price"])
+    return df
+
+
+CATEGORICAL_COLUMNS = ["Award", "country", "city", "Cuisine"]
+
+
+def categorize(df:pd.DataFrame) -> pd.DataFrame:
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype("category")
+    # Award codes follow AWARDS, with any award we do not know about after them.
+    extra = [a for a in df["Award"].cat.categories if a not in AWARDS]
+    df["Award"] = df["Award"].cat.set_categories(AWARDS + extra)
+    return df
@@ -0,0 +1,70 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+from modules.inverted_index import InvertedIndex
+
+FACETS = ["award", "country", "price", "cuisine", "facility"]
+
+# A restaurant has one award, country and price level, and matches any of the
+# selected ones. It has many cuisine keywords and facilities, and must have all
+# of the selected ones.
+MATCH_ALL = {"cuisine", "facility"}
+
+
+def facility_entries(facilities:pd.Series):
+    """(rid, entry) pairs of the comma separated FacilitiesAndServices of each restaurant."""
+    facilities = facilities.reset_index(drop=True)
+    entries = facilities.where(facilities.str.len() > 2).str.split(",").explode().str.strip()
+    entries = entries[entries.notna() & (entries != "")]
+    return entries.index.to_numpy(), entries.to_numpy()
+
+
+class FacetIndex:
+    """Inverted indexes over the map filters, built once per dataset.
+
+    Filters are dicts from facet name to the selected values, as strings. A
+    combination of filters resolves to a boolean mask over the restaurants by
+    OR-ing masks within a facet and AND-ing them across facets. The last few
+    masks are kept, since every map pan asks for the same one again.
+    """
+
+    def __init__(self, df:pd.DataFrame, cuisines):
+        self.n = len(df)
+        rids = np.arange(self.n)
+        self.indexes = {
+            "award": InvertedIndex(rids, df["Award"]),
+            "country": InvertedIndex(rids, df["country"]),
+            "price": InvertedIndex(rids, df["Price"].astype(str)),
+            "cuisine": cuisines.index,
+            "facility": InvertedIndex(*facility_entries(df["FacilitiesAndServices"])),
+        }
+        self._mask = functools.lru_cache(maxsize=16)(self._build_mask)
+
+    def options(self, facet) -> list:
+        return [str(key) for key in self.indexes[facet].keys if str(key)]
+
+    def mask(self, filters:dict):
+        """Boolean mask of the restaurants matching `filters`, or None when nothing is filtered.
+
+        The mask is shared between callers and read-only.
+        """
+        key = tuple((facet, tuple(sorted((filters or {}).get(facet) or ()))) for facet in FACETS)
+        if not any(values for _, values in key):
+            return None
+        return self._mask(key)
+
+    def _build_mask(self, key) -> np.ndarray:
+        mask = np.ones(self.n, dtype=bool)
+        for facet, values in key:
+            if not values:
+                continue
+            index = self.indexes[facet]
+            if facet in MATCH_ALL:
+                for value in values:
+                    mask &= index.mask([value], self.n)
+            else:
+                mask &= index.mask(values, self.n)
+        mask.flags.writeable = False
+        return mask
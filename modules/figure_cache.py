@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import threading
+
+import plotly.io as pio
+
+from modules.helpers import *
+from modules.metrics import FIGURE_CACHE_REQUESTS
+
+
+class FigureCache:
+    """Figures that depend only on the dataset, serialized to JSON once per dataset version.
+
+    Builders are registered by name and called with the Dataset. Entries of
+    older dataset versions are dropped as soon as a newer version is built.
+    With a `directory`, figures prerendered there by `prerender` are served as
+    they are, so a request never builds them.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.builders = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, builder):
+        self.builders[name] = builder
+
+    def _path(self, name, version) -> str:
+        return os.path.join(self.directory, version, f"{name}.json")
+
+    def _read(self, name, version):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(name, version), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def render(self, name, dataset) -> bytes:
+        return pio.to_json(self.builders[name](dataset), validate=False).encode()
+
+    def get(self, name, dataset) -> bytes:
+        key = (name, dataset.version)
+        body = self._entries.get(key)
+        result = "memory"
+        if body is None:
+            with self._lock:
+                body = self._entries.get(key)
+                if body is None:
+                    body = self._read(name, dataset.version)
+                    result = "disk"
+                    if body is None:
+                        body = self.render(name, dataset)
+                        result = "built"
+                    self._entries = {k: v for k, v in self._entries.items() if k[1] == dataset.version}
+                    self._entries[key] = body
+        FIGURE_CACHE_REQUESTS.labels(figure=name, result=result).inc()
+        return body
+
+    def prerender(self, dataset, names=None) -> list:
+        """Writes the figures to the directory for this dataset version and removes those of other versions."""
+        os.makedirs(os.path.join(self.directory, dataset.version), exist_ok=True)
+        paths = []
+        for name in names or self.builders:
+            path = self._path(name, dataset.version)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.render(name, dataset))
+            os.replace(tmp, path)
+            paths.append(path)
+        for version in os.listdir(self.directory):
+            if version != dataset.version:
+                shutil.rmtree(os.path.join(self.directory, version), ignore_errors=True)
+        return paths
+
+
+figure_cache = FigureCache(FIGURES_DIR)
@@ -0,0 +1,33 @@
+import numpy as np
+
+# Same radius as geopy.distance.great_circle.
+EARTH_RADIUS_KM = 6371.009
+
+
+def great_circle_km(lat, lon, lats, lons) -> np.ndarray:
+    """Haversine distances in km from (lat, lon) to every (lats, lons).
+
+    `lat`/`lon` may be scalars, giving an array shaped like `lats`, or arrays of
+    m points, giving an (m, n) matrix with one row per point.
+    """
+    lat1 = np.radians(np.atleast_1d(np.asarray(lat, dtype=float)))[:, None]
+    lon1 = np.radians(np.atleast_1d(np.asarray(lon, dtype=float)))[:, None]
+    lat2 = np.radians(np.asarray(lats, dtype=float))[None, :]
+    lon2 = np.radians(np.asarray(lons, dtype=float))[None, :]
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    km = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return km[0] if np.ndim(lat) == 0 else km
+
+
+def nearest(lat, lon, lats, lons, k=5, max_km=None):
+    """Positions and distances of the `k` points in (lats, lons) closest to (lat, lon), nearest first.
+
+    A full scan, meant for filtered subsets where a prebuilt index does not apply.
+    """
+    km = great_circle_km(lat, lon, lats, lons)
+    pos = np.flatnonzero(km <= max_km) if max_km is not None else np.arange(len(km))
+    if len(pos) > k:
+        pos = pos[np.argpartition(km[pos], k - 1)[:k]]
+    pos = pos[np.argsort(km[pos], kind="stable")]
+    return pos, km[pos]
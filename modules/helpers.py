@@ -2,6 +2,29 @@ from dash_iconify import DashIconify
 
 
 DATA_PATH = "data/michelin_by_Jerry_Ng.csv"
+ARTIFACT_PATH = "data/michelin.feather"
+# Analytics figures prerendered per dataset version by `python -m modules.build_data`.
+FIGURES_DIR = "data/figures"
+
+# Nearest restaurants listed in the alternatives drawer, optionally within a radius in km.
+ALTERNATIVES_K = 5
+ALTERNATIVES_MAX_KM = None
+
+# Below this zoom the map shows clusters per award from the map grid instead of single restaurants.
+MAP_CLUSTER_MAX_ZOOM = 8
+MAP_CLUSTER_CELL_PX = 64
+
+# Groq responses are cached on disk, shared by all workers.
+LLM_CACHE_PATH = "data/llm_cache.sqlite"
+LLM_CACHE_TTL = 7 * 24 * 3600
+LLM_CACHE_MAX_ENTRIES = 10_000
+# Day plans and songs pre-generated by `python -m modules.warmup`, read before the cache.
+LLM_CONTENT_PATH = "data/llm_content.sqlite"
+
+# Concurrent Groq streams per worker. Keep it below the gunicorn threads so that
+# chart callbacks always find a free thread.
+LLM_MAX_CONCURRENCY = 4
+LLM_TIMEOUT = 60
 
 def get_icon(icon):
-    return DashIconify(icon=icon, height=16)
\ No newline at end of file
+    return DashIconify(icon=icon, height=16)
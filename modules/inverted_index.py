@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+
+class InvertedIndex:
+    """Restaurant ids per key, built from (rid, key) pairs.
+
+    The pairs are sorted by key once, so the ids of a key are one slice and a
+    set of keys turns into a boolean mask without looking at the frame again.
+    """
+
+    def __init__(self, rids, keys):
+        keys = pd.Categorical(keys)
+        codes = keys.codes
+        valid = codes >= 0
+        order = np.argsort(codes[valid], kind="stable")
+        self.keys = keys.categories
+        self._rids = np.asarray(rids, dtype=np.int64)[valid][order]
+        self._bounds = np.searchsorted(codes[valid][order], np.arange(len(self.keys) + 1))
+
+    def rids(self, key) -> np.ndarray:
+        """Ids of the restaurants with `key`."""
+        code = self.keys.get_indexer([key])[0]
+        if code < 0:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(self._rids[self._bounds[code]:self._bounds[code + 1]])
+
+    def mask(self, keys, n) -> np.ndarray:
+        """Boolean mask over `n` restaurants, True where a restaurant has any of `keys`."""
+        mask = np.zeros(n, dtype=bool)
+        for code in self.keys.get_indexer(list(keys)):
+            if code >= 0:
+                mask[self._rids[self._bounds[code]:self._bounds[code + 1]]] = True
+        return mask
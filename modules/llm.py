@@ -0,0 +1,128 @@
+import os
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+from groq import Groq
+
+from modules.content_store import ContentStore
+from modules.helpers import *
+from modules.llm_cache import LLMCache
+from modules.llm_executor import LLMExecutor
+from modules.metrics import (GROQ_ERRORS, GROQ_FIRST_TOKEN_SECONDS,
+                             GROQ_SECONDS, register_stats)
+
+load_dotenv()
+
+MODEL = "llama3-8b-8192"
+
+
+def day_plan_prompt(name, city):
+    return f"Please create a short day plan of a visit in {city} where I will eat at the restaurant named {name}."
+
+
+def music_prompt(name, city):
+    return (f"Please recommend 3 songs that would be great to listen on my trip to {city}"
+            f" where I will eat at the restaurant named {name}."
+            f" Please return the recommendation as markdown.")
+
+
+class FakeGroq:
+    """Stand-in for the Groq client that answers after `latency` seconds without any network call."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, messages, model, stream=False, **kwargs):
+        self.calls += 1
+        content = f"*{model}* would answer: {messages[-1]['content']}"
+        if stream:
+            return self._stream(content.split(" "))
+        time.sleep(self.latency)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def _stream(self, words):
+        for i, word in enumerate(words):
+            time.sleep(self.latency / len(words))
+            delta = SimpleNamespace(content=word if i == 0 else f" {word}")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+PROMPTS = {
+    "day-plan": day_plan_prompt,
+    "music": music_prompt,
+}
+
+
+def get_client():
+    if os.getenv("GROQ_FAKE"):
+        return FakeGroq(latency=float(os.getenv("GROQ_FAKE_LATENCY", "0")))
+    return Groq(api_key=os.getenv("GROQ_API_KEY"), timeout=LLM_TIMEOUT)
+
+
+client = get_client()
+cache = LLMCache(LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES)
+content = ContentStore(LLM_CONTENT_PATH)
+executor = LLMExecutor(max_concurrency=LLM_MAX_CONCURRENCY, timeout=LLM_TIMEOUT)
+
+
+def cache_stats() -> dict:
+    stats = cache.stats()
+    reads = stats["hits"] + stats["misses"]
+    return {**stats, "hit_rate": stats["hits"] / reads if reads else 0.0}
+
+
+register_stats("llm_cache", "LLM response cache shared by the workers: entries, hits, misses and hit_rate.",
+               cache_stats)
+
+
+def stream_completion(prompt, model=MODEL):
+    """Yield the completion in pieces as Groq produces them and cache it once it is complete."""
+    chunks = []
+    start = time.perf_counter()
+    try:
+        response = client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=model,
+            stream=True,
+        )
+    except Exception:
+        GROQ_ERRORS.inc()
+        raise
+    try:
+        for chunk in response:
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                if not chunks:
+                    GROQ_FIRST_TOKEN_SECONDS.observe(time.perf_counter() - start)
+                chunks.append(text)
+                yield text
+    except Exception:
+        GROQ_ERRORS.inc()
+        raise
+    finally:
+        if hasattr(response, "close"):
+            response.close()
+    GROQ_SECONDS.observe(time.perf_counter() - start)
+    cache.set(model, prompt, "".join(chunks))
+
+
+def stream(prompt, model=MODEL):
+    """Pieces of the completion: all at once when it is cached, otherwise streamed on the LLM executor.
+
+    Raises LLMBusy when the executor has no free slot.
+    """
+    response = cache.get(model, prompt)
+    if response is not None:
+        return iter([response])
+    return executor.stream(stream_completion, prompt, model)
+
+
+def stream_for(kind, name, city, model=MODEL):
+    """Pieces of the `kind` content for a restaurant, preferring what the warm-up job generated."""
+    text = content.get(kind, name, city)
+    if text is not None:
+        return iter([text])
+    return stream(PROMPTS[kind](name, city), model)
@@ -0,0 +1,89 @@
+import contextlib
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO counters VALUES ('hits', 0), ('misses', 0);
+"""
+
+
+class LLMCache:
+    """Completions keyed by (model, prompt) in a SQLite file.
+
+    The file is shared by every gunicorn worker and survives restarts. Entries
+    expire `ttl` seconds after they were written, and the least recently read
+    entries are evicted once there are more than `max_entries`. Hit and miss
+    counters are kept in the same file so they cover all workers.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=10_000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # A connection must not survive a fork: the app is imported in the
+        # gunicorn master, so the schema is created on one that is closed at
+        # once, and each thread of a worker opens its own on first use.
+        with contextlib.closing(sqlite3.connect(path, timeout=10, isolation_level=None)) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def key(model, prompt) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+    def get(self, model, prompt):
+        conn = self._connect()
+        key = self.key(model, prompt)
+        now = time.time()
+        row = conn.execute("SELECT response, created FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None and now - row[1] > self.ttl:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            row = None
+        if row is None:
+            conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'misses'")
+            return None
+        conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+        conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+        return row[0]
+
+    def set(self, model, prompt, response):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                     (self.key(model, prompt), model, prompt, response, now, now))
+        conn.execute("DELETE FROM entries WHERE key IN ("
+                     " SELECT key FROM entries ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                     (self.max_entries,))
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        stats = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+        stats["entries"] = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return stats
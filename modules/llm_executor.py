@@ -0,0 +1,74 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class LLMBusy(Exception):
+    """Raised when every LLM slot is taken."""
+
+
+class LLMExecutor:
+    """Runs LLM streams on a dedicated, bounded thread pool.
+
+    The thread serving a request only waits on a queue with a deadline, and a
+    request that finds every slot taken fails right away instead of queueing.
+    With fewer slots than request threads per worker, chart callbacks always
+    find a free thread. Closing the consuming generator (the browser went away)
+    cancels the stream at its next piece.
+    """
+
+    def __init__(self, max_concurrency=4, timeout=60):
+        self.pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.timeout = timeout
+
+    def stream(self, produce, *args):
+        """Iterate `produce(*args)` on the pool and return a generator over its pieces.
+
+        Raises LLMBusy immediately when no slot is free. The returned
+        generator raises TimeoutError once `timeout` seconds have passed.
+        """
+        if not self.slots.acquire(blocking=False):
+            raise LLMBusy()
+        pieces = queue.Queue()
+        cancelled = threading.Event()
+        try:
+            self.pool.submit(self._produce, pieces, cancelled, produce, *args)
+        except Exception:
+            self.slots.release()
+            raise
+        return self._consume(pieces, cancelled)
+
+    def _produce(self, pieces, cancelled, produce, *args):
+        try:
+            iterator = produce(*args)
+            try:
+                for piece in iterator:
+                    if cancelled.is_set():
+                        return
+                    pieces.put(("piece", piece))
+            finally:
+                iterator.close()
+            pieces.put(("done", None))
+        except Exception as e:
+            pieces.put(("error", e))
+        finally:
+            self.slots.release()
+
+    def _consume(self, pieces, cancelled):
+        deadline = time.monotonic() + self.timeout
+        try:
+            while True:
+                try:
+                    kind, value = pieces.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    raise TimeoutError(f"No answer within {self.timeout}s") from None
+                if kind == "piece":
+                    yield value
+                elif kind == "error":
+                    raise value
+                else:
+                    return
+        finally:
+            cancelled.set()
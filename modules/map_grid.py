@@ -0,0 +1,102 @@
+import numpy as np
+import pandas as pd
+
+# Width in pixels of the whole world at zoom 0 on a MapLibre map.
+WORLD_PX = 512
+MAX_MERCATOR_LAT = 85.0511
+
+
+def mercator(lat, lon):
+    """Web-mercator coordinates of (lat, lon), both in [0, 1)."""
+    lat = np.radians(np.clip(np.asarray(lat, dtype=float), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (np.asarray(lon, dtype=float) + 180) / 360
+    y = (1 - np.log(np.tan(lat) + 1 / np.cos(lat)) / np.pi) / 2
+    return np.clip(x, 0, 1 - 1e-12), np.clip(y, 0, 1 - 1e-12)
+
+
+def inverse_mercator_lat(y):
+    return np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * np.asarray(y, dtype=float)))))
+
+
+def viewport_bounds(relayout_data:dict, zoom, center, width_px=1600, height_px=800):
+    """(west, south, east, north) of the visible map.
+
+    Uses the corner coordinates MapLibre reports in `map._derived` when they
+    are part of the relayout data, otherwise estimates them from the center and
+    zoom for a map of the given size.
+    """
+    derived = (relayout_data or {}).get("map._derived", {}).get("coordinates")
+    if derived:
+        lons, lats = zip(*derived)
+        return min(lons), min(lats), max(lons), max(lats)
+    world = WORLD_PX * 2 ** zoom
+    x, y = mercator(center["lat"], center["lon"])
+    half_lon = width_px / 2 / world * 360
+    south = inverse_mercator_lat(min(y + height_px / 2 / world, 1))
+    north = inverse_mercator_lat(max(y - height_px / 2 / world, 0))
+    if half_lon >= 180:
+        return -180, float(south), 180, float(north)
+    west = (center["lon"] - half_lon + 180) % 360 - 180
+    east = (center["lon"] + half_lon + 180) % 360 - 180
+    return west, float(south), east, float(north)
+
+
+class MapGrid:
+    """Restaurants aggregated per award on a web-mercator grid, one level per zoom.
+
+    Level z splits the world into `cells_per_tile * 2**z` cells per axis, so a
+    cell covers about `cell_px` screen pixels at zoom z. Each level is derived
+    from the finest one by shifting cell coordinates, so every cell nests in
+    exactly one cell of the level above. Restaurants are also sorted by their
+    cell on the finest level, which answers bounding-box queries.
+    """
+
+    def __init__(self, lat, lon, award_codes, max_zoom=8, cell_px=64):
+        self.max_zoom = max_zoom
+        self.cells_per_tile = WORLD_PX // cell_px
+        x, y = mercator(lat, lon)
+        self.n = n = self.cells_per_tile * 2 ** max_zoom
+        self.cx = (x * n).astype(np.int64)
+        self.cy = (y * n).astype(np.int64)
+        keys = self.cx * n + self.cy
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+        self.points = pd.DataFrame({"award": award_codes, "lat": lat, "lon": lon})
+        self.levels = [self._aggregate(max_zoom - z) for z in range(max_zoom + 1)]
+
+    def _aggregate(self, shift:int, mask=None) -> pd.DataFrame:
+        points = self.points.assign(cx=self.cx >> shift, cy=self.cy >> shift)
+        if mask is not None:
+            points = points[mask]
+        return (points.groupby(["award", "cx", "cy"], sort=True)
+                      .agg(count=("lat", "size"), lat=("lat", "mean"), lon=("lon", "mean"))
+                      .reset_index())
+
+    def level_for_zoom(self, zoom) -> int:
+        return int(np.clip(np.floor(zoom), 0, self.max_zoom))
+
+    def clusters(self, zoom, mask=None) -> pd.DataFrame:
+        """One row per (award, cell) at the level for `zoom`, with its restaurant count and centroid.
+
+        With a boolean `mask`, only the restaurants it selects are counted.
+        """
+        level = self.level_for_zoom(zoom)
+        if mask is None:
+            return self.levels[level]
+        return self._aggregate(self.max_zoom - level, mask)
+
+    def cells_in_bounds(self, bounds) -> np.ndarray:
+        """Keys of the non-empty finest-level cells overlapping (west, south, east, north)."""
+        west, south, east, north = bounds
+        (x0, x1), (y0, y1) = [(v * self.n).astype(np.int64) for v in mercator([north, south], [west, east])]
+        xs = np.arange(x0, x1 + 1) if x0 <= x1 else np.r_[x0:self.n, 0:x1 + 1]
+        cells = (xs[:, None] * self.n + np.arange(y0, y1 + 1)[None, :]).ravel()
+        return np.intersect1d(cells, self.sorted_keys)
+
+    def points_in_cells(self, cells) -> np.ndarray:
+        """Positions of the restaurants in the given finest-level cells."""
+        cells = np.unique(np.asarray(cells, dtype=np.int64))
+        start = np.searchsorted(self.sorted_keys, cells, side="left")
+        counts = np.searchsorted(self.sorted_keys, cells, side="right") - start
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.order[np.repeat(start, counts) + offsets]
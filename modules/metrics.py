@@ -0,0 +1,79 @@
+import os
+
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY,
+                               CollectorRegistry, Counter, Histogram,
+                               generate_latest, multiprocess)
+from prometheus_client.core import GaugeMetricFamily
+
+# Seconds, from a cached lookup to a slow Groq answer.
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Bytes, from an empty callback response to a full map figure.
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class StatsCollector:
+    """A gauge per key of a `stats()` dict, read when the metrics are scraped."""
+
+    def __init__(self, name, documentation, stats):
+        self.name = name
+        self.documentation = documentation
+        self.stats = stats
+
+    def collect(self):
+        try:
+            stats = self.stats()
+        except Exception:
+            # A store that is unavailable must not break the scrape.
+            return
+        family = GaugeMetricFamily(self.name, self.documentation, labels=["stat"])
+        for key, value in sorted(stats.items()):
+            family.add_metric([key], value)
+        yield family
+
+
+# Stats of stores shared by every worker, so they are read, not aggregated.
+_stats = CollectorRegistry()
+
+
+def register_stats(name, documentation, stats):
+    _stats.register(StatsCollector(name, documentation, stats))
+
+
+def render() -> bytes:
+    """Every metric in the Prometheus text format.
+
+    gunicorn.conf.py sets PROMETHEUS_MULTIPROC_DIR, where each process writes
+    its counters and histograms; they are summed over all of them, exited
+    workers included, so whichever worker answers the scrape reports the
+    whole server.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_stats)
+
+
+CALLBACK_SECONDS = Histogram(
+    "dash_callback_duration_seconds", "Time to answer a Dash callback request.", ["callback", "input"],
+    buckets=DURATION_BUCKETS)
+CALLBACK_BYTES = Histogram(
+    "dash_callback_response_bytes", "Size of Dash callback responses.", ["callback", "input"], buckets=SIZE_BUCKETS)
+CALLBACK_ERRORS = Counter("dash_callback_errors", "Dash callback requests that failed.", ["callback", "input"])
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to answer the other routes, up to the first byte for streams.", ["route"],
+    buckets=DURATION_BUCKETS)
+HTTP_BYTES = Histogram(
+    "http_response_bytes", "Size of the responses of the other routes with a known length.", ["route"],
+    buckets=SIZE_BUCKETS)
+GROQ_SECONDS = Histogram(
+    "groq_request_duration_seconds", "Time of streaming Groq requests, to the last token.", buckets=DURATION_BUCKETS)
+GROQ_FIRST_TOKEN_SECONDS = Histogram(
+    "groq_first_token_seconds", "Time from a streaming Groq request to its first token.", buckets=DURATION_BUCKETS)
+GROQ_ERRORS = Counter("groq_errors", "Streaming Groq requests that failed.")
+DATASET_LOAD_SECONDS = Histogram(
+    "dataset_load_duration_seconds", "Time to load the dataset and build its indexes.", ["source"],
+    buckets=DURATION_BUCKETS)
+FIGURE_CACHE_REQUESTS = Counter(
+    "figure_cache_requests", "Figure cache lookups by where the figure came from.", ["figure", "result"])
@@ -0,0 +1,28 @@
+import resource
+import sys
+
+
+def memory_usage(pid="self") -> dict:
+    """Resident memory of a process in bytes.
+
+    `rss` counts every resident page, `pss` splits pages shared with other
+    processes between them, and `shared` is the resident part that is shared.
+    Summing `pss` over the gunicorn workers gives their real footprint. Outside
+    Linux only the peak RSS of the current process is known.
+    """
+    fields = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared"}
+    usage = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in fields:
+                    usage[fields[key]] = usage.get(fields[key], 0) + int(value.split()[0]) * 1024
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        usage["rss"] = peak if sys.platform == "darwin" else peak * 1024
+    return usage
+
+
+def format_usage(usage:dict) -> str:
+    return ", ".join(f"{key} {value / 2**20:,.1f} MiB" for key, value in usage.items())
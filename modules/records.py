@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+
+class RecordStore:
+    """Restaurant rows as plain dicts, keyed by restaurant id (the row position in the dataset).
+
+    Rows are read from the frame on demand, a click at a time, so the store
+    holds no Python object per restaurant.
+    """
+
+    def __init__(self, df:pd.DataFrame):
+        self.df = df
+        # First occurrence wins, like the `df[df['Name'] == name].iloc[0]` lookups this replaces.
+        first = ~df["Name"].duplicated().to_numpy()
+        self.ids_by_name = pd.Series(np.flatnonzero(first), index=pd.Index(df["Name"].to_numpy()[first]))
+
+    def __len__(self):
+        return len(self.df)
+
+    def get(self, rid) -> dict:
+        return self.df.iloc[int(rid)].to_dict()
+
+    def id_for_name(self, name):
+        rid = self.ids_by_name.get(name)
+        return None if rid is None else int(rid)
+
+    def by_name(self, name) -> dict:
+        return self.get(self.ids_by_name[name])
@@ -0,0 +1,54 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+from modules.geo import EARTH_RADIUS_KM, great_circle_km, nearest
+
+
+def to_unit_sphere(lat, lon) -> np.ndarray:
+    lat, lon = np.radians(lat), np.radians(lon)
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def km_to_chord(km):
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+
+class SpatialIndex:
+    """KD-tree over restaurant positions projected onto the unit sphere.
+
+    The straight-line (chord) distance between two points on the sphere grows
+    monotonically with their great-circle distance, so Euclidean nearest
+    neighbours are great-circle nearest neighbours.
+    """
+
+    def __init__(self, lat, lon):
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.size = len(lat)
+        self.tree = cKDTree(to_unit_sphere(lat, lon))
+
+    def nearest(self, lat, lon, k=5, max_km=None, exclude=(), mask=None):
+        """Positions and great-circle distances in km of the `k` restaurants closest to (lat, lon).
+
+        With a boolean `mask`, only the restaurants it selects are candidates;
+        those are scanned directly instead of going through the tree.
+        """
+        exclude = np.asarray(exclude, dtype=int)
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            candidates = candidates[~np.isin(candidates, exclude)]
+            pos, km = nearest(lat, lon, self.lat[candidates], self.lon[candidates], k=k, max_km=max_km)
+            return candidates[pos], km
+        n = min(k + len(exclude), self.size)
+        if n <= 0:
+            return np.empty(0, dtype=int), np.empty(0)
+        if max_km is None or max_km >= np.pi * EARTH_RADIUS_KM:
+            bound = np.inf
+        else:
+            bound = km_to_chord(max_km)
+        chord, pos = self.tree.query(to_unit_sphere(lat, lon)[0], k=n, distance_upper_bound=bound)
+        chord, pos = np.atleast_1d(chord), np.atleast_1d(pos)
+        keep = np.isfinite(chord) & ~np.isin(pos, exclude)
+        pos = pos[keep][:k]
+        return pos, great_circle_km(lat, lon, self.lat[pos], self.lon[pos])
@@ -0,0 +1,71 @@
+import argparse
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.dataset import load_dataset
+from modules.llm import MODEL, PROMPTS, content, get_client
+
+logger = logging.getLogger(__name__)
+
+
+class Throttle:
+    """Spaces calls out to at most `per_minute` per minute across all threads."""
+
+    def __init__(self, per_minute):
+        self.interval = 60 / per_minute if per_minute else 0
+        self.next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(self.next, now)
+            self.next = start + self.interval
+        time.sleep(start - now)
+
+
+def warm(df, client, store, kinds=tuple(PROMPTS), concurrency=4, per_minute=30, model=MODEL, force=False):
+    """Generate the `kinds` content for every (name, city) pair in `df` that `store` does not have yet.
+
+    Returns the number of generated and failed entries.
+    """
+    existing = set() if force else store.keys()
+    pairs = df[["Name", "city"]].astype(str).drop_duplicates().itertuples(index=False)
+    jobs = [(kind, name, city) for name, city in pairs for kind in kinds if (kind, name, city) not in existing]
+    throttle = Throttle(per_minute)
+    failed = []
+
+    def generate(job):
+        kind, name, city = job
+        throttle.wait()
+        try:
+            chat_completion = client.chat.completions.create(
+                messages=[{"role": "user", "content": PROMPTS[kind](name, city)}],
+                model=model,
+            )
+            store.set(kind, name, city, model, chat_completion.choices[0].message.content)
+        except Exception:
+            logger.exception("Generating %s for %s in %s failed", kind, name, city)
+            failed.append(job)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(generate, jobs))
+    return len(jobs) - len(failed), len(failed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate day plans and songs for the most visited restaurants.")
+    parser.add_argument("--awards", nargs="+", default=["3 Stars", "2 Stars"])
+    parser.add_argument("--kinds", nargs="+", default=list(PROMPTS), choices=list(PROMPTS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--per-minute", type=int, default=30, help="Maximum Groq requests per minute.")
+    parser.add_argument("--force", action="store_true", help="Regenerate entries that already exist.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    df = load_dataset().df
+    df = df[df["Award"].isin(args.awards)]
+    generated, failed = warm(df, get_client(), content, args.kinds, args.concurrency, args.per_minute, force=args.force)
+    print(f"Generated {generated:,} entries for {len(df):,} restaurants, {failed:,} failed.")
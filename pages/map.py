@@ -1,21 +1,23 @@
-import os
-
 import dash
 import dash_mantine_components as dmc
-import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import plotly.io as pio
-from dash_extensions.enrich import (Input, Output, Serverside, callback, dcc,
-                                    html, no_update, clientside_callback)
+from dash import Patch, set_props
+from dash_extensions.enrich import (MATCH, ClientsideFunction, Input, Output,
+                                    State, callback, clientside_callback, ctx,
+                                    dcc, html, no_update)
 from dotenv import load_dotenv
-from geopy import distance
 from geopy.extra.rate_limiter import RateLimiter
 from geopy.geocoders import Nominatim
-from groq import Groq
 
 from modules.country_map import *
+from modules.dataset import get_dataset
+from modules.enrichment import AWARD_SIZES
+from modules.figure_cache import figure_cache
 from modules.helpers import *
+from modules.map_grid import viewport_bounds
 
 load_dotenv()
 
@@ -28,8 +30,6 @@ dash.register_page(
     path="/",
     name="Map")
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
 geolocator = Nominatim(user_agent="dash_challenge")
 geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
 
@@ -37,154 +37,340 @@ geocode = RateLimiter(geolocator.geocode, min_delay_seconds=1)
 # top cards
 ######################################################################
 
-@callback(
-    Output("stats", "children"),
-    Input("data-store", "data")
-    )
-def update_analytics_graph(df:pd.DataFrame):
-    number_of_countries = df["country"].nunique()
-    number_of_restaurants = len(df)
-    number_1_star = df[df['Award'] == '1 Star'].shape[0]
-    number_2_star = df[df['Award'] == '2 Stars'].shape[0]
-    number_3_star = df[df['Award'] == '3 Stars'].shape[0]
-
-    cards = dmc.Flex([
-            dmc.Card(
-                children=[
-                    dmc.Center(
-                        dmc.Flex([
-                            DashIconify(icon="mdi:map", height=30),
-                        ])
+# The cards are part of the layout; callbacks only fill in the numbers.
+stats_cards = dmc.Flex([
+    dmc.Card(
+        children=[
+            dmc.Center(
+                dmc.Flex([
+                    DashIconify(icon="mdi:map", height=30),
+                ])
+            ),
+            dmc.Text("Countries"),
+            html.Hr(className="stats-card-hr"),
+            dmc.Title(id="stats-countries", order=1)
+            ],
+        className="stats-card"
+        ),
+    dmc.Card(
+        children=[
+            dmc.Center(
+                dmc.Flex([
+                    DashIconify(icon="mdi:storefront-outline", height=30),
+                ])
+            ),
+            dmc.Text("Restaurants"),
+            html.Hr(className="stats-card-hr"),
+            dmc.Title(id="stats-restaurants", order=1)
+            ],
+        className="stats-card"
+        ),
+    dmc.Card(
+        children=[
+            dmc.Center(
+                dmc.Flex([
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
                     ),
-                    dmc.Text("Countries"),
-                    html.Hr(className="stats-card-hr"),
-                    dmc.Title(f"{number_of_countries:,.0f}", order=1)
-                    ],
-                className="stats-card"
-                ),
-            dmc.Card(
-                children=[
-                    dmc.Center(
-                        dmc.Flex([
-                            DashIconify(icon="mdi:storefront-outline", height=30),
-                        ])
+                    dmc.Space(w=5),
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
                     ),
-                    dmc.Text("Restaurants"),
-                    html.Hr(className="stats-card-hr"),
-                    dmc.Title(f"{number_of_restaurants:,.0f}", order=1)
-                    ],
-                className="stats-card"
-                ),
-            dmc.Card(
-                children=[
-                    dmc.Center(
-                        dmc.Flex([
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                            dmc.Space(w=5),
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                            dmc.Space(w=5),
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                        ])
+                    dmc.Space(w=5),
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
                     ),
-                    dmc.Text("Restaurants"),
-                    html.Hr(className="stats-card-hr"),
-                    dmc.Title(f"{number_3_star:,.0f}", order=1)
-                    ],
-                className="stats-card"
-                ),
-            dmc.Card(
-                children=[
-                    dmc.Center(
-                        dmc.Flex([
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                            dmc.Space(w=5),
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                        ])
+                ])
+            ),
+            dmc.Text("Restaurants"),
+            html.Hr(className="stats-card-hr"),
+            dmc.Title(id="stats-3-stars", order=1)
+            ],
+        className="stats-card"
+        ),
+    dmc.Card(
+        children=[
+            dmc.Center(
+                dmc.Flex([
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
                     ),
-                    dmc.Text("Restaurants"),
-                    html.Hr(className="stats-card-hr"),
-                    dmc.Title(f"{number_2_star:,.0f}", order=1)
-                    ],
-                className="stats-card"
-                ),
-            dmc.Card(
-                children=[
-                    dmc.Center(
-                        dmc.Flex([
-                            dmc.Image(
-                                src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
-                                h=30,
-                            ),
-                        ])
+                    dmc.Space(w=5),
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
                     ),
-                    dmc.Text("Restaurants"),
-                    html.Hr(className="stats-card-hr"),
-                    dmc.Title(f"{number_1_star:,.0f}", order=1)
-                    ],
-                className="stats-card"
-                ),
+                ])
+            ),
+            dmc.Text("Restaurants"),
+            html.Hr(className="stats-card-hr"),
+            dmc.Title(id="stats-2-stars", order=1)
             ],
-            direction={"base": "column", "md": "row"},
-            align="center",
-            gap="md",
-            justify="space-between")
-    return cards
+        className="stats-card"
+        ),
+    dmc.Card(
+        children=[
+            dmc.Center(
+                dmc.Flex([
+                    dmc.Image(
+                        src="https://upload.wikimedia.org/wikipedia/commons/a/ad/MichelinStar.svg",
+                        h=30,
+                    ),
+                ])
+            ),
+            dmc.Text("Restaurants"),
+            html.Hr(className="stats-card-hr"),
+            dmc.Title(id="stats-1-star", order=1)
+            ],
+        className="stats-card"
+        ),
+    ],
+    direction={"base": "column", "md": "row"},
+    align="center",
+    gap="md",
+    justify="space-between")
 
-######################################################################
-# Map
-######################################################################
 
 @callback(
-    Output("map-fig", "figure"),
+    Output("stats-countries", "children"),
+    Output("stats-restaurants", "children"),
+    Output("stats-3-stars", "children"),
+    Output("stats-2-stars", "children"),
+    Output("stats-1-star", "children"),
     Input("data-store", "data"),
+    Input("map-filter", "data"),
     )
-def update_map(df:pd.DataFrame):
-    dfs_awards = [df for _,df in df.groupby('Award', sort=False)]
+def update_analytics_graph(version:str, filters:dict):
+    dataset = get_dataset()
+    counts = dataset.summary.counts(dataset.facets.mask(filters))
+    return [f"{counts[key]:,.0f}" for key in ("countries", "restaurants", "3 Stars", "2 Stars", "1 Star")]
+
+######################################################################
+# Map
+######################################################################
+
+MAP_CENTER = dict(lat=48, lon=6)
+MAP_ZOOM = 4
+
+CLUSTER_HOVER = '<b>%{text}</b><br>%{customdata[1]}'
+MARKER_HOVER = '<b>%{text}</b><br>%{customdata[1]}<br>%{lat}, %{lon}'
+
+# The map has one cluster trace per award followed by one marker trace per
+# award. Below MAP_CLUSTER_MAX_ZOOM only the cluster traces are visible and
+# hold the grid cells of the current level. Above it only the marker traces
+# are visible; they start empty and the restaurants of each newly visible grid
+# cell are appended to them as the user pans, so every restaurant is sent to a
+# session at most once. A change of the filters replaces the clusters and the
+# loaded markers with those of the matching restaurants and starts over.
+
+def get_cluster_traces(dataset, zoom, mask=None):
+    cells = dataset.grid.clusters(zoom, mask)
+    traces = []
+    for code, award in enumerate(dataset.df['Award'].cat.categories):
+        tmp = cells[cells['award'] == code]
+        size = AWARD_SIZES[min(code, len(AWARD_SIZES) - 1)]
+        traces.append(dict(
+            lat=tmp['lat'].tolist(),
+            lon=tmp['lon'].tolist(),
+            text=[f"{count:,} restaurants" if count > 1 else "1 restaurant" for count in tmp['count']],
+            customdata=[[-1, award]] * len(tmp),
+            marker=dict(size=np.minimum(size + 4 * np.log2(tmp['count']), 45).tolist(), opacity=0.8),
+        ))
+    return traces
+
+
+def get_marker_points(dataset, rows):
+    traces = []
+    for code, award in enumerate(dataset.df['Award'].cat.categories):
+        tmp = dataset.df.iloc[rows[dataset.award_codes[rows] == code]]
+        traces.append(dict(
+            lat=tmp['Latitude'].tolist(),
+            lon=tmp['Longitude'].tolist(),
+            text=tmp['Name'].tolist(),
+            customdata=[[rid, award] for rid in tmp.index],
+            size=tmp['award_size'].tolist(),
+        ))
+    return traces
+
+
+def build_map_figure(dataset):
+    awards = dataset.df['Award'].cat.categories
+    clustered = MAP_ZOOM < MAP_CLUSTER_MAX_ZOOM
     fig = go.Figure()
-    for tmp in dfs_awards:
-        fig.add_trace(
-            go.Scattermap(
-                lat=tmp['Latitude'],
-                lon=tmp['Longitude'],
-                mode='markers',
-                marker=dict(
-                    size=tmp['award_size'],
-                    opacity=0.8,
-                    ),
-                text=tmp['Name'],
-                customdata=tmp['Award'],
-                hoverinfo='text',
-                hovertemplate='<b>%{text}</b><br>%{customdata}<br>%{lat}, %{lon}',
-                showlegend=True,
-                name=tmp['Award'].iloc[0],
-                )
-            )
+    for trace in get_cluster_traces(dataset, MAP_ZOOM):
+        fig.add_trace(go.Scattermap(mode='markers', hovertemplate=CLUSTER_HOVER, visible=clustered, **trace))
+    for trace in get_marker_points(dataset, np.empty(0, dtype=int)):
+        size = trace.pop('size')
+        fig.add_trace(go.Scattermap(mode='markers', hovertemplate=MARKER_HOVER, visible=not clustered,
+                                    marker=dict(size=size, opacity=0.8), **trace))
+    for i, trace in enumerate(fig.data):
+        trace.update(name=awards[i % len(awards)], legendgroup=awards[i % len(awards)], hoverinfo='text')
 
     fig.update_layout(
         height=800,
         clickmode='event',
+        uirevision='map',
         map=dict(
             bearing=0,
-            center=go.layout.map.Center(lat=48, lon=6),
-            zoom=4
+            center=go.layout.map.Center(**MAP_CENTER),
+            zoom=MAP_ZOOM
         ))
     return fig
 
+figure_cache.register("map", build_map_figure)
+
+# The figure is serialized once per dataset version and served from /figures,
+# so sessions fetch it (and revalidate via ETag) without any callback work.
+# Filters that are already set are sent again, so they apply to the new figure.
+clientside_callback(
+    """
+    function(version, filters) {
+        const no_update = window.dash_clientside.no_update;
+        if (!version) {
+            return [no_update, no_update, no_update];
+        }
+        const filtered = filters && Object.values(filters).some(values => values && values.length);
+        return fetch(`/figures/map.json?v=${version}`)
+            .then(response => response.json())
+            .then(figure => [figure, null, filtered ? Object.assign({}, filters) : no_update]);
+    }
+    """,
+    Output("map-fig", "figure"),
+    Output("map-view", "data"),
+    Output("map-filter", "data", allow_duplicate=True),
+    Input("data-store", "data"),
+    State("map-filter", "data"),
+    prevent_initial_call="initial_duplicate",
+    )
+
+
+def render_map_view(dataset, mask, view, zoom, bounds, reset=False):
+    """Patch for the map figure at `zoom` showing `bounds`, and the new map-view.
+
+    Only what changed since `view` is sent, unless `reset`, which replaces the
+    clusters and markers for a new set of filters.
+    """
+    level = dataset.grid.level_for_zoom(zoom) if zoom < MAP_CLUSTER_MAX_ZOOM else "markers"
+    cells = [] if reset else view["cells"]
+    n = len(dataset.df['Award'].cat.categories)
+    patch = Patch()
+    if reset:
+        for code in range(n):
+            trace = patch["data"][n + code]
+            for key in ("lat", "lon", "text", "customdata"):
+                trace[key] = []
+            trace["marker"]["size"] = []
+
+    if level != "markers":
+        if view["level"] == level and not reset:
+            return no_update, no_update
+        for code, trace in enumerate(get_cluster_traces(dataset, zoom, mask)):
+            patch["data"][code].update(dict(trace, visible=True))
+            patch["data"][n + code]["visible"] = False
+        return patch, dict(view, level=level, cells=cells)
+
+    visible = dataset.grid.cells_in_bounds(bounds)
+    new_cells = np.setdiff1d(visible, cells)
+    if view["level"] == "markers" and not len(new_cells) and not reset:
+        return no_update, no_update
+    if view["level"] != "markers" or reset:
+        for code in range(n):
+            patch["data"][code]["visible"] = False
+            patch["data"][n + code]["visible"] = True
+    rows = dataset.grid.points_in_cells(new_cells)
+    if mask is not None:
+        rows = rows[mask[rows]]
+    for code, points in enumerate(get_marker_points(dataset, rows)):
+        if points['lat']:
+            trace = patch["data"][n + code]
+            for key in ("lat", "lon", "text", "customdata"):
+                trace[key].extend(points[key])
+            trace["marker"]["size"].extend(points["size"])
+    return patch, dict(view, level="markers", cells=np.union1d(cells, new_cells).tolist())
+
+
+@callback(
+    Output("map-fig", "figure", allow_duplicate=True),
+    Output("map-view", "data", allow_duplicate=True),
+    Input("map-fig", "relayoutData"),
+    State("map-view", "data"),
+    State("map-filter", "data"),
+    prevent_initial_call=True,
+    )
+def update_map_view(relayout_data, view, filters):
+    zoom = (relayout_data or {}).get("map.zoom")
+    center = (relayout_data or {}).get("map.center")
+    if zoom is None or center is None:
+        return no_update, no_update
+    dataset = get_dataset()
+    bounds = viewport_bounds(relayout_data, zoom, center)
+    view = dict(view or {"level": MAP_ZOOM if MAP_ZOOM < MAP_CLUSTER_MAX_ZOOM else "markers", "cells": []},
+                zoom=zoom, bounds=bounds)
+    return render_map_view(dataset, dataset.facets.mask(filters), view, zoom, bounds)
+
+
+@callback(
+    Output("map-fig", "figure", allow_duplicate=True),
+    Output("map-view", "data", allow_duplicate=True),
+    Input("map-filter", "data"),
+    State("map-view", "data"),
+    prevent_initial_call=True,
+    )
+def filter_map(filters, view):
+    dataset = get_dataset()
+    mask = dataset.facets.mask(filters)
+    if view is None and mask is None:
+        # The figure as fetched already shows every restaurant.
+        return no_update, no_update
+    view = view or {"level": None, "cells": []}
+    zoom = view.get("zoom", MAP_ZOOM)
+    bounds = view.get("bounds") or viewport_bounds(None, zoom, MAP_CENTER)
+    return render_map_view(dataset, mask, view, zoom, bounds, reset=True)
+
+######################################################################
+# Filters
+######################################################################
+
+def price_label(level):
+    return int(level) * "$" if int(level) else "Unknown"
+
+
+@callback(
+    Output("filter-award", "data"),
+    Output("filter-country", "data"),
+    Output("filter-price", "data"),
+    Output("filter-cuisine", "data"),
+    Output("filter-facility", "data"),
+    Input("data-store", "data"),
+    )
+def update_filter_options(version:str):
+    facets = get_dataset().facets
+    return (
+        facets.options("award"),
+        facets.options("country"),
+        [{"value": level, "label": price_label(level)} for level in facets.options("price")],
+        facets.options("cuisine"),
+        facets.options("facility"),
+    )
+
+clientside_callback(
+    """
+    function(award, country, price, cuisine, facility) {
+        return {award: award, country: country, price: price, cuisine: cuisine, facility: facility};
+    }
+    """,
+    Output("map-filter", "data"),
+    Input("filter-award", "value"),
+    Input("filter-country", "value"),
+    Input("filter-price", "value"),
+    Input("filter-cuisine", "value"),
+    Input("filter-facility", "value"),
+    )
+
 ######################################################################
 # Modal
 ######################################################################
@@ -196,16 +382,24 @@ def update_map(df:pd.DataFrame):
     Input("data-store", "data"),
     Input("map-fig", "clickData"),
     )
-def update_map(df:pd.DataFrame, click_data):
+def update_map(version:str, click_data):
     if click_data is None:
         return no_update
     else:
-        name = click_data['points'][0]['text']
-        desc = df[df['Name'] == name]['Description'].iloc[0]
-        city = df[df['Name'] == name]['city'].iloc[0]
-        url = df[df['Name'] == name]['Url'].iloc[0]
-        restaurant_url = df[df['Name'] == name]['WebsiteUrl'].iloc[0]
-        features = df[df['Name'] == name]['FacilitiesAndServices'].iloc[0].split(",") if len(df[df['Name'] == name]['FacilitiesAndServices'].iloc[0]) > 2 else []
+        records = get_dataset().records
+        point = click_data['points'][0]
+        rid = point['customdata'][0] if 'customdata' in point else records.id_for_name(point['text'])
+        if rid is None or rid < 0:
+            # A cluster, not a restaurant.
+            return no_update
+        record = records.get(rid)
+        name = record['Name']
+        desc = record['Description']
+        city = record['city']
+        url = record['Url']
+        restaurant_url = record['WebsiteUrl']
+        facilities = record['FacilitiesAndServices']
+        features = facilities.split(",") if isinstance(facilities, str) and len(facilities) > 2 else []
 
         children = [
             dmc.Card(
@@ -219,7 +413,7 @@ def update_map(df:pd.DataFrame, click_data):
                     dmc.Space(h=40),
                     html.Hr(),
                     dmc.Flex([
-                        dmc.Badge(f"{df[df['Name'] == name]['Award'].iloc[0]}", color="red")
+                        dmc.Badge(f"{record['Award']}", color="red")
                     ],
                     justify={"sm": "center"},
                     wrap="wrap"),
@@ -258,50 +452,59 @@ def update_map(df:pd.DataFrame, click_data):
                 ]
             )
         ]
-        return children, True, Serverside([name, city])
+        return children, True, rid
 
 ######################################################################
 # Drawer Day Plan
 ######################################################################
 
+# The drawer and the music modal open right away; their text is streamed from
+# /llm/<kind>/<rid> into the Markdown by assets/llm_stream.js.
+
 @callback(
     Output("plan-my-day-drawer", "opened"),
     Output("plan-my-day-drawer", "children"),
+    Output("plan-my-day-stream", "data"),
     Input("plan-my-day-btn", "n_clicks"),
     Input("click-data", "data"),
     prevent_initial_call=True,
     )
 def update_map(n_clicks, click_data):
     if n_clicks>0:
-        name = click_data[0]
-        city = click_data[1]
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": f"Please create a short day plan of a visit in {city} where I will eat at the restaurant named {name}.",
-                }
-            ],
-            model="llama3-8b-8192",
-        )
-        day_plan = chat_completion.choices[0].message.content
+        record = get_dataset().records.get(click_data)
+        name = record['Name']
         children = [
             dmc.Text(f"My day at {name.title()}", fw=700),
             dmc.Space(h=20),
             html.Hr(),
             dmc.Space(h=20),
-            dcc.Markdown(day_plan),
+            dcc.Markdown(id="plan-my-day-markdown"),
             dmc.Space(h=20),
         ]
-        return True, children
+        return True, children, {"url": f"/llm/day-plan/{click_data}", "target": "plan-my-day-markdown"}
     else:
-        return False, no_update
+        return False, no_update, no_update
+
+clientside_callback(
+    ClientsideFunction(namespace="llm", function_name="stream"),
+    Output("plan-my-day-markdown", "children"),
+    Input("plan-my-day-stream", "data"),
+    prevent_initial_call=True,
+    )
+
+clientside_callback(
+    ClientsideFunction(namespace="llm", function_name="close"),
+    Output("plan-my-day-stream", "data", allow_duplicate=True),
+    Input("plan-my-day-drawer", "opened"),
+    State("plan-my-day-stream", "data"),
+    prevent_initial_call=True,
+    )
 
 ######################################################################
 # Drawer Alternatives
 ######################################################################
 
-def get_alt_entry(row, i):
+def get_alt_entry(row, rid):
     entry = dmc.Card(
         children=[
             dmc.Group([
@@ -314,9 +517,7 @@ def get_alt_entry(row, i):
             dmc.Space(h=10),
             dmc.Group([
                 dcc.Link(dmc.Button("Get me there"), href=f"http://maps.google.com/maps?z=10&q={row['Latitude']},{row['Longitude']}", target="_blank"),
-                dmc.Button("for the way", id=f"for-the-way-btn-{str(i)}", leftSection=DashIconify(icon="mdi:music", height=20), color="green"),
-                html.P(children=row["Name"], id=f"for-the-way-name-{str(i)}", hidden=True, n_clicks=0),
-                html.P(children=row["city"], id=f"for-the-way-city-{str(i)}", hidden=True, n_clicks=0),
+                dmc.Button("for the way", id={"type": "for-the-way-btn", "rid": int(rid)}, leftSection=DashIconify(icon="mdi:music", height=20), color="green"),
             ])
         ], className="alt-card")
     return entry
@@ -327,24 +528,27 @@ def get_alt_entry(row, i):
     Input("alternatives-btn", "n_clicks"),
     Input("click-data", "data"),
     Input("data-store", "data"),
+    State("map-filter", "data"),
     prevent_initial_call=True,
     )
-def update_map(n_clicks, click_data, df:pd.DataFrame):
+def update_map(n_clicks, click_data, version:str, filters:dict):
     if n_clicks>0:
-        name = click_data[0]
-        long = df[df['Name'] == name]['Longitude'].iloc[0]
-        lat = df[df['Name'] == name]['Latitude'].iloc[0]
-        
-        df = df[df.Name!=name].copy()
-        df["distance"] = df.apply(lambda x: distance.great_circle((lat, long), (x['Latitude'], x['Longitude'])).km, axis=1)
-        df = df.sort_values("distance")[:5].reset_index(drop=True)
-        
+        dataset = get_dataset()
+        record = dataset.records.get(click_data)
+        name = record['Name']
+        long = record['Longitude']
+        lat = record['Latitude']
+
+        pos, dist = dataset.spatial.nearest(lat, long, k=ALTERNATIVES_K, max_km=ALTERNATIVES_MAX_KM, exclude=[click_data],
+                                            mask=dataset.facets.mask(filters))
+        df = dataset.df.iloc[pos].assign(distance=dist)
+
         children = [
             dmc.Text(f"Alternatives to {name.title()}", fw=700),
             dmc.Space(h=20),
             html.Hr(),
             dmc.Space(h=20),
-            *[get_alt_entry(row, i) for i,row in df.iterrows()],
+            *[get_alt_entry(row, rid) for rid,row in df.iterrows()],
         ]
         return True, children
     else:
@@ -354,68 +558,49 @@ def update_map(n_clicks, click_data, df:pd.DataFrame):
 # Music Modal
 ######################################################################
 
-def get_music_children(name, city):
-    chat_completion = client.chat.completions.create(
-        messages=[
-            {
-                "role": "user",
-                "content": (f"Please recommend 3 songs that would be great to listen on my trip to {city}"
-                            f" where I will eat at the restaurant named {name}."
-                            f" Please return the recommendation as markdown."),
-            }
-        ],
-        model="llama3-8b-8192",
-    )
-    recommendation = chat_completion.choices[0].message.content
+def get_music_children(name):
     children = [
         dmc.Text(f"Songs for my trip to {name.title()}", fw=700),
         dmc.Space(h=20),
         html.Hr(),
         dmc.Space(h=20),
-        dcc.Markdown(recommendation),
+        dcc.Markdown(id="for-the-way-markdown"),
         dmc.Space(h=20),
     ]
     return children
 
 
+# Only the clicked button's n_clicks is sent; the restaurant comes from its id.
+# The renderer rejects a MATCH input without a MATCH output, so the button's
+# own `loading` is the output and the modal is opened through set_props.
 @callback(
-    Output("for-the-way-modal", "children"),
-    Output("for-the-way-modal", "opened"),
-    Input("for-the-way-btn-0", "n_clicks"),
-    Input("for-the-way-btn-1", "n_clicks"),
-    Input("for-the-way-btn-2", "n_clicks"),
-    Input("for-the-way-btn-3", "n_clicks"),
-    Input("for-the-way-btn-4", "n_clicks"),
-    Input("for-the-way-name-0", "children"),
-    Input("for-the-way-name-1", "children"),
-    Input("for-the-way-name-2", "children"),
-    Input("for-the-way-name-3", "children"),
-    Input("for-the-way-name-4", "children"),
-    Input("for-the-way-city-0", "children"),
-    Input("for-the-way-city-1", "children"),
-    Input("for-the-way-city-2", "children"),
-    Input("for-the-way-city-3", "children"),
-    Input("for-the-way-city-4", "children"),
+    Output({"type": "for-the-way-btn", "rid": MATCH}, "loading"),
+    Input({"type": "for-the-way-btn", "rid": MATCH}, "n_clicks"),
+    prevent_initial_call=True,
+    )
+def update_map(n_clicks):
+    if not n_clicks:
+        return no_update
+    rid = ctx.triggered_id["rid"]
+    record = get_dataset().records.get(rid)
+    set_props("for-the-way-modal", {"children": get_music_children(record['Name']), "opened": True})
+    set_props("for-the-way-stream", {"data": {"url": f"/llm/music/{rid}", "target": "for-the-way-markdown"}})
+    return False
+
+clientside_callback(
+    ClientsideFunction(namespace="llm", function_name="stream"),
+    Output("for-the-way-markdown", "children"),
+    Input("for-the-way-stream", "data"),
+    prevent_initial_call=True,
+    )
+
+clientside_callback(
+    ClientsideFunction(namespace="llm", function_name="close"),
+    Output("for-the-way-stream", "data", allow_duplicate=True),
+    Input("for-the-way-modal", "opened"),
+    State("for-the-way-stream", "data"),
     prevent_initial_call=True,
     )
-def update_map(n_clicks_0, n_clicks_1, n_clicks_2, n_clicks_3, n_clicks_4, name_0, name_1, name_2, name_3, name_4, city_0, city_1, city_2, city_3, city_4):
-    if n_clicks_0 and n_clicks_0 > 0:
-        children = get_music_children(name_0, city_0)
-        return children, True
-    elif n_clicks_1 and n_clicks_1 > 0:
-        children = get_music_children(name_1, city_1)
-        return children, True
-    elif n_clicks_2 and n_clicks_2 > 0:
-        children = get_music_children(name_2, city_2)
-        return children, True
-    elif n_clicks_3 and n_clicks_3 > 0:
-        children = get_music_children(name_3, city_3)
-        return children, True
-    elif n_clicks_4 and n_clicks_4 > 0:
-        children = get_music_children(name_4, city_4)
-        return children, True
-    else:
-        return no_update, False
 
 ######################################################################
 # Layout
@@ -436,8 +621,17 @@ layout = html.Div([
             position="left",
             size="lg",
         ),
-    html.Div(id="stats"),
+    html.Div(stats_cards, id="stats"),
     dmc.Space(h=20),
+    dmc.Card(
+        dmc.SimpleGrid([
+            dmc.MultiSelect(id="filter-award", value=[], label="Award", placeholder="Any", searchable=True, clearable=True),
+            dmc.MultiSelect(id="filter-country", value=[], label="Country", placeholder="Any", searchable=True, clearable=True),
+            dmc.MultiSelect(id="filter-price", value=[], label="Price", placeholder="Any", clearable=True),
+            dmc.MultiSelect(id="filter-cuisine", value=[], label="Cuisine", placeholder="Any", searchable=True, clearable=True),
+            dmc.MultiSelect(id="filter-facility", value=[], label="Facilities", placeholder="Any", searchable=True, clearable=True),
+        ], cols={"base": 1, "sm": 2, "lg": 5}),
+        className="analytics-card"),
     dmc.Card([dcc.Graph(style={"width": "100%"}, id="map-fig")], className="map-card"),
     dmc.Modal(
         id="restaurant-description",
@@ -449,4 +643,8 @@ layout = html.Div([
         zIndex=2000,
         ),
     dcc.Store(id="click-data"),
+    dcc.Store(id="map-view"),
+    dcc.Store(id="map-filter"),
+    dcc.Store(id="plan-my-day-stream"),
+    dcc.Store(id="for-the-way-stream"),
 ])
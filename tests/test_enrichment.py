@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.country_map import *
+from modules.enrichment import enrich
+
+
+def size_mapping(award):
+    if award == '3 Stars':
+        return 25
+    elif award == '2 Stars':
+        return 20
+    elif award == '1 Star':
+        return 15
+    elif award == 'Bib Gourmand':
+        return 7
+    else:
+        return 5
+
+
+def get_stars(award):
+    if award == '3 Stars':
+        return 3
+    elif award == '2 Stars':
+        return 2
+    elif award == '1 Star':
+        return 1
+    else:
+        return 0
+
+
+def apply_enrich(df:pd.DataFrame) -> pd.DataFrame:
+    """The row-by-row enrichment that modules.enrichment replaced."""
+    df['award_size'] = df['Award'].apply(size_mapping)
+    df["country"] = df.Location.apply(lambda x: x.split(",")[-1].strip())
+    df["country"] = df.country.map(country_name_map)
+    df["city"] = df.Location.apply(lambda x: x.split(",")[0].strip())
+    df["stars"] = df.Award.apply(lambda x: get_stars(x))
+    df["country_codes"] = df.country.map(country_code_map)
+    df["population"] = df.country_codes.map(country_population_map)
+    df.Price = df.Price.astype(str).apply(lambda x: len(x) if x != "nan" else 0)
+    return df
+
+
+@pytest.fixture
+def restaurants():
+    # Missing prices are NaN, as read_csv leaves them.
+    return pd.DataFrame({
+        "Name": ["A", "B", "C", "D", "E", "F", "G"],
+        "Location": ["Paris, France", "Tokyo, Japan", "Singapore", "Hong Kong SAR China",
+                     "Brooklyn, New York, USA", " Lyon , France ", "Florence, Tuscany, Italy"],
+        "Award": ["3 Stars", "2 Stars", "1 Star", "Bib Gourmand", "Selected Restaurants",
+                  "Green Star", "3 Stars"],
+        "Price": ["€€€€", "¥¥¥", np.nan, "$$", np.nan, "€", "€€"],
+    })
+
+
+def test_enrich_matches_apply(restaurants):
+    expected = apply_enrich(restaurants.copy())
+    pd.testing.assert_frame_equal(enrich(restaurants.copy()), expected)
+
+
+def test_unknown_award_gets_the_default(restaurants):
+    row = enrich(restaurants.copy()).iloc[5]
+    assert (row["award_size"], row["stars"]) == (5, 0)
+
+
+def test_locations(restaurants):
+    df = enrich(restaurants.copy())
+    assert df["city"].tolist() == ["Paris", "Tokyo", "Singapore", "Hong Kong SAR China", "Brooklyn", "Lyon",
+                                   "Florence"]
+    assert df["country"].iloc[2] == country_name_map.get("Singapore")
+    assert df["country"].iloc[4] == country_name_map.get("USA")
+
+
+def test_missing_prices_are_level_zero(restaurants):
+    assert enrich(restaurants.copy())["Price"].tolist() == [4, 3, 0, 2, 0, 1, 2]